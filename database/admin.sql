@@ -1,15 +1,16 @@
--- 1. Appointment summary by status
-SELECT status, COUNT(*) as count
-FROM Appointment
-GROUP BY status;
+-- 1. Appointment summary by status (precomputed, see migration 003)
+SELECT status, appointment_count as count
+FROM AppointmentSummary
+WHERE appointment_count > 0
+ORDER BY status;
 
 
--- 2. Revenue summary (paid, unpaid, total)
+-- 2. Revenue summary (paid, unpaid, total; precomputed, see migration 003)
 SELECT 
-    SUM(CASE WHEN status = 'paid' THEN amount ELSE 0 END) as total_paid,
-    SUM(CASE WHEN status = 'unpaid' THEN amount ELSE 0 END) as total_unpaid,
-    SUM(amount) as total_revenue
-FROM Invoice;
+    SUM(CASE WHEN status = 'paid' THEN total_amount ELSE 0 END) as total_paid,
+    SUM(CASE WHEN status = 'unpaid' THEN total_amount ELSE 0 END) as total_unpaid,
+    SUM(total_amount) as total_revenue
+FROM RevenueSummary;
 
 
 -- 3. Recent completed appointments (last 10)
@@ -39,10 +40,13 @@ SELECT
     sch.available_day,
     sch.start_time,
     sch.end_time,
-    sch.is_booked
+    COUNT(sl.slot_id) AS upcoming_slots,
+    IFNULL(SUM(sl.is_booked), 0) AS booked_slots
 FROM Schedule sch
 JOIN Doctor d ON sch.doctor_id = d.doctor_id
 JOIN Specialization s ON d.specialization_id = s.specialization_id
+LEFT JOIN Slot sl ON sl.schedule_id = sch.schedule_id AND sl.slot_date >= CURDATE()
+GROUP BY sch.schedule_id
 ORDER BY d.doctor_id, sch.available_day, sch.start_time;
 
 
@@ -148,3 +152,129 @@ ORDER BY i.issue_date;
 UPDATE Invoice 
 SET status = 'paid' 
 WHERE appointment_id = %s;
+
+
+-- 12. Count appointments (optionally by status, for pagination), from the trigger-maintained summary
+SELECT IFNULL(SUM(appointment_count), 0) AS total
+FROM AppointmentSummary
+WHERE status = %s;
+
+
+-- 13. Page of appointments after a keyset cursor (newest first)
+SELECT 
+    a.appointment_id,
+    a.appointment_datetime,
+    a.status,
+    a.reason_for_visit,
+    p.first_name as patient_first,
+    p.last_name as patient_last,
+    p.phone_number,
+    d.first_name as doctor_first,
+    d.last_name as doctor_last,
+    s.specialization_name
+FROM Appointment a
+JOIN Patient p ON a.patient_id = p.patient_id
+JOIN Schedule sch ON a.schedule_id = sch.schedule_id
+JOIN Doctor d ON sch.doctor_id = d.doctor_id
+JOIN Specialization s ON d.specialization_id = s.specialization_id
+WHERE a.status = %s
+  AND (a.appointment_datetime < %s OR (a.appointment_datetime = %s AND a.appointment_id < %s))
+ORDER BY a.appointment_datetime DESC, a.appointment_id DESC
+LIMIT %s;
+
+
+-- 14. Invoice every eligible completed appointment in a date range (set-based #8 + #9)
+INSERT INTO Invoice (appointment_id, amount, issue_date, status)
+SELECT a.appointment_id, s.consultation_fee, CURDATE(), 'unpaid'
+FROM Appointment a
+JOIN Schedule sch     ON a.schedule_id = sch.schedule_id
+JOIN Doctor d         ON sch.doctor_id = d.doctor_id
+JOIN Specialization s ON d.specialization_id = s.specialization_id
+LEFT JOIN Invoice i   ON a.appointment_id = i.appointment_id
+WHERE a.status = 'completed' AND i.appointment_id IS NULL
+  AND a.appointment_datetime >= %s
+  AND a.appointment_datetime < %s + INTERVAL 1 DAY;
+
+
+-- 15. Lock a set of invoices before a bulk payment update
+SELECT appointment_id, status
+FROM Invoice
+WHERE appointment_id IN (%s)
+FOR UPDATE;
+
+
+-- 16. Mark a set of invoices as paid
+UPDATE Invoice
+SET status = 'paid'
+WHERE appointment_id IN (%s) AND status <> 'paid';
+
+
+-- 17. Full-text search of patients by name (ranked, paginated)
+SELECT
+    patient_id, first_name, last_name, dob, phone_number, email,
+    MATCH(first_name, last_name) AGAINST (%s IN BOOLEAN MODE) AS score
+FROM Patient
+WHERE MATCH(first_name, last_name) AGAINST (%s IN BOOLEAN MODE)
+ORDER BY score DESC, patient_id
+LIMIT %s OFFSET %s;
+
+
+-- 18. Full-text search of medical records (ranked, paginated)
+SELECT
+    r.appointment_id,
+    r.diagnosis,
+    r.prescription,
+    r.notes,
+    a.appointment_datetime,
+    p.patient_id,
+    p.first_name AS patient_first,
+    p.last_name AS patient_last,
+    d.first_name AS doctor_first,
+    d.last_name AS doctor_last,
+    MATCH(r.diagnosis, r.prescription, r.notes) AGAINST (%s IN BOOLEAN MODE) AS score
+FROM Record r
+JOIN Appointment a ON r.appointment_id = a.appointment_id
+JOIN Patient p ON a.patient_id = p.patient_id
+JOIN Schedule sch ON a.schedule_id = sch.schedule_id
+JOIN Doctor d ON sch.doctor_id = d.doctor_id
+WHERE MATCH(r.diagnosis, r.prescription, r.notes) AGAINST (%s IN BOOLEAN MODE)
+ORDER BY score DESC, a.appointment_datetime DESC
+LIMIT %s OFFSET %s;
+
+
+-- 19. Export appointments in a date range (streamed, oldest first)
+SELECT
+    a.appointment_id,
+    a.appointment_datetime,
+    a.status,
+    a.reason_for_visit,
+    p.first_name AS patient_first,
+    p.last_name AS patient_last,
+    p.phone_number,
+    d.first_name AS doctor_first,
+    d.last_name AS doctor_last,
+    s.specialization_name
+FROM Appointment a
+JOIN Patient p ON a.patient_id = p.patient_id
+JOIN Schedule sch ON a.schedule_id = sch.schedule_id
+JOIN Doctor d ON sch.doctor_id = d.doctor_id
+JOIN Specialization s ON d.specialization_id = s.specialization_id
+WHERE a.appointment_datetime >= %s AND a.appointment_datetime < %s + INTERVAL 1 DAY
+ORDER BY a.appointment_datetime, a.appointment_id;
+
+
+-- 20. Export invoices issued in a date range (streamed, oldest first)
+SELECT
+    i.appointment_id,
+    i.amount,
+    i.issue_date,
+    i.status,
+    p.first_name AS patient_first,
+    p.last_name AS patient_last,
+    a.appointment_datetime,
+    a.reason_for_visit
+FROM Invoice i
+JOIN Appointment a ON i.appointment_id = a.appointment_id
+JOIN Patient p ON a.patient_id = p.patient_id
+WHERE i.issue_date >= %s AND i.issue_date < %s + INTERVAL 1 DAY
+ORDER BY i.issue_date, i.appointment_id;
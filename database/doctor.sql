@@ -4,7 +4,7 @@ FROM Doctor d
 JOIN Specialization s ON d.specialization_id = s.specialization_id;
 
 
--- 2. View today scheduled appointments
+-- 2. View scheduled appointments in a date window (today / this week), earliest first
 SELECT 
     a.appointment_id,
     a.reason_for_visit,
@@ -16,40 +16,26 @@ SELECT
     p.last_name AS patient_last_name,
     p.gender,
     p.dob
-FROM Appointment a
-JOIN Schedule sch ON a.schedule_id = sch.schedule_id
+FROM Schedule sch
+JOIN Appointment a ON a.schedule_id = sch.schedule_id
 JOIN Patient p ON a.patient_id = p.patient_id
 WHERE sch.doctor_id = %s 
-  AND a.status = 'scheduled';
+  AND a.status = 'scheduled'
+  AND a.appointment_datetime >= %s
+  AND a.appointment_datetime < %s
+ORDER BY a.appointment_datetime;
 
 
--- 3. Get patient basic information
-SELECT first_name, last_name, dob, gender, phone_number, email, address
-FROM Patient
-WHERE patient_id = %s;
+-- 3. Get patient basic information (retired)
+-- Retired: the visit screens get demographics from #10 in the same round trip.
 
 
--- 4. Get patient previous visit history with medical records
-SELECT 
-    a.appointment_datetime,
-    a.reason_for_visit,
-    r.diagnosis,
-    r.prescription,
-    r.notes
-FROM Appointment a
-LEFT JOIN Record r ON a.appointment_id = r.appointment_id
-WHERE a.patient_id = %s 
-  AND a.status = 'completed'
-  AND a.appointment_id != %s
-ORDER BY a.appointment_datetime DESC
-LIMIT 5;
+-- 4. Get patient previous visit history with medical records (retired)
+-- Retired: the last 5 visits come from the LATERAL join in #10.
 
 
--- 5. Get current appointment details
-SELECT p.first_name, p.last_name, a.reason_for_visit
-FROM Appointment a
-JOIN Patient p ON a.patient_id = p.patient_id
-WHERE a.appointment_id = %s;
+-- 5. Get current appointment details (retired)
+-- Retired: the current appointment comes from #10 and is kept for the visit.
 
 
 -- 6. Update appointment status to completed
@@ -61,3 +47,86 @@ WHERE appointment_id = %s;
 -- 7. Create medical record
 INSERT INTO Record (appointment_id, diagnosis, prescription, notes) 
 VALUES (%s, %s, %s, %s);
+
+
+-- 8. Full-text search of this doctor's medical records (ranked, paginated)
+SELECT
+    r.appointment_id,
+    r.diagnosis,
+    r.prescription,
+    r.notes,
+    a.appointment_datetime,
+    p.patient_id,
+    p.first_name AS patient_first,
+    p.last_name AS patient_last,
+    d.first_name AS doctor_first,
+    d.last_name AS doctor_last,
+    MATCH(r.diagnosis, r.prescription, r.notes) AGAINST (%s IN BOOLEAN MODE) AS score
+FROM Record r
+JOIN Appointment a ON r.appointment_id = a.appointment_id
+JOIN Patient p ON a.patient_id = p.patient_id
+JOIN Schedule sch ON a.schedule_id = sch.schedule_id
+JOIN Doctor d ON sch.doctor_id = d.doctor_id
+WHERE MATCH(r.diagnosis, r.prescription, r.notes) AGAINST (%s IN BOOLEAN MODE)
+  AND sch.doctor_id = %s
+ORDER BY score DESC, a.appointment_datetime DESC
+LIMIT %s OFFSET %s;
+
+
+-- 9. Scheduled appointments per day in a date window (dashboard header)
+SELECT DATE(a.appointment_datetime) AS day, COUNT(*) AS count
+FROM Schedule sch
+JOIN Appointment a ON a.schedule_id = sch.schedule_id
+WHERE sch.doctor_id = %s
+  AND a.status = 'scheduled'
+  AND a.appointment_datetime >= %s
+  AND a.appointment_datetime < %s
+GROUP BY DATE(a.appointment_datetime)
+ORDER BY day;
+
+
+-- 10. Patient context for a visit: demographics, current appointment and last 5 visits in one round trip
+SELECT
+    cur.appointment_id,
+    cur.patient_id,
+    cur.reason_for_visit,
+    cur.appointment_datetime,
+    cur.status,
+    p.first_name,
+    p.last_name,
+    p.dob,
+    p.gender,
+    p.phone_number,
+    p.email,
+    p.address,
+    h.appointment_datetime AS visit_datetime,
+    h.reason_for_visit AS visit_reason,
+    h.diagnosis,
+    h.prescription,
+    h.notes
+FROM Appointment cur
+JOIN Patient p ON cur.patient_id = p.patient_id
+LEFT JOIN LATERAL (
+    SELECT a.appointment_datetime, a.reason_for_visit, r.diagnosis, r.prescription, r.notes
+    FROM Appointment a
+    LEFT JOIN Record r ON a.appointment_id = r.appointment_id
+    WHERE a.patient_id = cur.patient_id
+      AND a.status = 'completed'
+      AND a.appointment_id != cur.appointment_id
+    ORDER BY a.appointment_datetime DESC
+    LIMIT %s
+) h ON TRUE
+WHERE cur.appointment_id = %s
+ORDER BY h.appointment_datetime DESC;
+
+
+-- 11. Next scheduled appointment after the current one (context prefetch)
+SELECT a.appointment_id
+FROM Schedule sch
+JOIN Appointment a ON a.schedule_id = sch.schedule_id
+WHERE sch.doctor_id = %s
+  AND a.status = 'scheduled'
+  AND a.appointment_datetime >= %s
+  AND a.appointment_id != %s
+ORDER BY a.appointment_datetime, a.appointment_id
+LIMIT 1;
@@ -0,0 +1,20 @@
+-- 001. Secondary indexes for the hot predicates in patient.sql, doctor.sql and admin.sql
+
+-- patient.sql #2: patient login by date of birth
+CREATE INDEX idx_patient_dob ON Patient (dob);
+
+-- admin.sql #1, #3, #6, #8: filter / GROUP BY status, newest first
+CREATE INDEX idx_appointment_status_datetime
+    ON Appointment (status, appointment_datetime);
+
+-- patient.sql #3, #4 and doctor.sql #10 (visit history): one patient's appointments by status, newest first
+CREATE INDEX idx_appointment_patient_status_datetime
+    ON Appointment (patient_id, status, appointment_datetime);
+
+-- doctor.sql #2: a doctor's scheduled appointments, reached through Schedule
+CREATE INDEX idx_appointment_schedule_status_datetime
+    ON Appointment (schedule_id, status, appointment_datetime);
+
+-- admin.sql #10: unpaid invoices oldest first; amount makes admin.sql #2 index-only
+CREATE INDEX idx_invoice_status_issue_date
+    ON Invoice (status, issue_date, amount);
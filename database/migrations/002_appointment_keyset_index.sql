@@ -0,0 +1,5 @@
+-- 002. Index for keyset pagination of the admin "All Appointments" view
+
+-- admin.sql #13 without a status filter: newest first, seek on (datetime, id).
+-- InnoDB appends the primary key, so this orders by (appointment_datetime, appointment_id).
+CREATE INDEX idx_appointment_datetime ON Appointment (appointment_datetime);
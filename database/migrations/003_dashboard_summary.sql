@@ -0,0 +1,72 @@
+-- 003. Precomputed dashboard aggregates, maintained by triggers
+
+-- admin.sql #1: appointment count per status
+CREATE TABLE AppointmentSummary (
+    status VARCHAR(20) PRIMARY KEY,
+    appointment_count INT NOT NULL DEFAULT 0
+);
+
+-- admin.sql #2: invoice count and amount per payment status
+CREATE TABLE RevenueSummary (
+    status VARCHAR(20) PRIMARY KEY,
+    invoice_count INT NOT NULL DEFAULT 0,
+    total_amount DECIMAL(14, 2) NOT NULL DEFAULT 0
+);
+
+-- Every write adds its row to the new status and removes it from the old one.
+-- Note: rows removed by ON DELETE CASCADE do not fire triggers; the
+-- reconciliation job (python -m scripts.reconcile_summary) repairs that drift.
+CREATE TRIGGER trg_appointment_summary_insert AFTER INSERT ON Appointment
+FOR EACH ROW
+    INSERT INTO AppointmentSummary (status, appointment_count)
+    VALUES (IFNULL(NEW.status, 'unknown'), 1) AS delta
+    ON DUPLICATE KEY UPDATE appointment_count = appointment_count + delta.appointment_count;
+
+CREATE TRIGGER trg_appointment_summary_update AFTER UPDATE ON Appointment
+FOR EACH ROW
+    INSERT INTO AppointmentSummary (status, appointment_count)
+    VALUES (IFNULL(NEW.status, 'unknown'), 1), (IFNULL(OLD.status, 'unknown'), -1) AS delta
+    ON DUPLICATE KEY UPDATE appointment_count = appointment_count + delta.appointment_count;
+
+CREATE TRIGGER trg_appointment_summary_delete AFTER DELETE ON Appointment
+FOR EACH ROW
+    INSERT INTO AppointmentSummary (status, appointment_count)
+    VALUES (IFNULL(OLD.status, 'unknown'), -1) AS delta
+    ON DUPLICATE KEY UPDATE appointment_count = appointment_count + delta.appointment_count;
+
+CREATE TRIGGER trg_revenue_summary_insert AFTER INSERT ON Invoice
+FOR EACH ROW
+    INSERT INTO RevenueSummary (status, invoice_count, total_amount)
+    VALUES (IFNULL(NEW.status, 'unknown'), 1, IFNULL(NEW.amount, 0)) AS delta
+    ON DUPLICATE KEY UPDATE
+        invoice_count = invoice_count + delta.invoice_count,
+        total_amount = total_amount + delta.total_amount;
+
+CREATE TRIGGER trg_revenue_summary_update AFTER UPDATE ON Invoice
+FOR EACH ROW
+    INSERT INTO RevenueSummary (status, invoice_count, total_amount)
+    VALUES
+        (IFNULL(NEW.status, 'unknown'), 1, IFNULL(NEW.amount, 0)),
+        (IFNULL(OLD.status, 'unknown'), -1, -IFNULL(OLD.amount, 0)) AS delta
+    ON DUPLICATE KEY UPDATE
+        invoice_count = invoice_count + delta.invoice_count,
+        total_amount = total_amount + delta.total_amount;
+
+CREATE TRIGGER trg_revenue_summary_delete AFTER DELETE ON Invoice
+FOR EACH ROW
+    INSERT INTO RevenueSummary (status, invoice_count, total_amount)
+    VALUES (IFNULL(OLD.status, 'unknown'), -1, -IFNULL(OLD.amount, 0)) AS delta
+    ON DUPLICATE KEY UPDATE
+        invoice_count = invoice_count + delta.invoice_count,
+        total_amount = total_amount + delta.total_amount;
+
+-- Initial contents
+INSERT INTO AppointmentSummary (status, appointment_count)
+SELECT IFNULL(status, 'unknown'), COUNT(*)
+FROM Appointment
+GROUP BY IFNULL(status, 'unknown');
+
+INSERT INTO RevenueSummary (status, invoice_count, total_amount)
+SELECT IFNULL(status, 'unknown'), COUNT(*), IFNULL(SUM(amount), 0)
+FROM Invoice
+GROUP BY IFNULL(status, 'unknown');
@@ -0,0 +1,10 @@
+-- 004. Patient login by date of birth plus phone number or name prefix
+
+-- patient.sql #2: dob + exact phone number
+CREATE INDEX idx_patient_dob_phone ON Patient (dob, phone_number);
+
+-- patient.sql #14: dob + last/first name prefix
+CREATE INDEX idx_patient_dob_name ON Patient (dob, last_name, first_name);
+
+-- Both new indexes start with dob, so the single-column one from 001 is redundant
+DROP INDEX idx_patient_dob ON Patient;
@@ -0,0 +1,7 @@
+-- 005. FULLTEXT indexes for patient and medical record search
+
+-- admin.sql #17: patients by name
+CREATE FULLTEXT INDEX ft_patient_name ON Patient (first_name, last_name);
+
+-- admin.sql #18 and doctor.sql #8: records by diagnosis, prescription and notes
+CREATE FULLTEXT INDEX ft_record_text ON Record (diagnosis, prescription, notes);
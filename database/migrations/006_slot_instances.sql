@@ -0,0 +1,22 @@
+-- 006. Concrete, dated slot instances generated from the weekly Schedule templates
+
+-- One row per template per date over a rolling horizon, filled in by
+-- python -m scripts.generate_slots. Booking state lives here, per date;
+-- Schedule.is_booked is no longer read or written by the app.
+CREATE TABLE Slot (
+    slot_id INT PRIMARY KEY AUTO_INCREMENT,
+    schedule_id INT NOT NULL,
+    doctor_id INT NOT NULL,
+    slot_date DATE NOT NULL,
+    start_time TIME NOT NULL,
+    end_time TIME NOT NULL,
+    is_booked BOOLEAN NOT NULL DEFAULT FALSE,
+    appointment_id INT NULL,
+    UNIQUE KEY uq_slot_schedule_date (schedule_id, slot_date),
+    FOREIGN KEY (schedule_id) REFERENCES Schedule(schedule_id) ON DELETE CASCADE,
+    FOREIGN KEY (doctor_id) REFERENCES Doctor(doctor_id),
+    FOREIGN KEY (appointment_id) REFERENCES Appointment(appointment_id) ON DELETE SET NULL
+);
+
+-- patient.sql #9: a doctor's free slots in a date range, in calendar order
+CREATE INDEX idx_slot_doctor_date_time ON Slot (doctor_id, slot_date, start_time);
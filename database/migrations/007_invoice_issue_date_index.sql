@@ -0,0 +1,5 @@
+-- 007. Index for date-ranged invoice exports
+
+-- admin.sql #20: invoices issued in a date range, in issue order.
+-- The (status, issue_date) index from 001 cannot serve a range without a status.
+CREATE INDEX idx_invoice_issue_date ON Invoice (issue_date);
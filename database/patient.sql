@@ -2,10 +2,12 @@
 INSERT INTO Patient (first_name, last_name, dob, gender, phone_number, email, address) 
 VALUES (%s, %s, %s, %s, %s, %s, %s);
 
--- 2. Search patient by date of birth (login)
+-- 2. Search patient by date of birth and phone number (login)
 SELECT patient_id, first_name, last_name, phone_number, email 
 FROM Patient 
-WHERE dob = %s;
+WHERE dob = %s AND phone_number = %s
+ORDER BY last_name, first_name, patient_id
+LIMIT %s;
 
 -- 3. View all appointments (with doctor and specialization details)
 SELECT 
@@ -55,10 +57,10 @@ SET status = 'cancelled'
 WHERE appointment_id = %s;
 
 
--- 6. Free up the schedule slot 
-UPDATE Schedule 
-SET is_booked = FALSE 
-WHERE schedule_id = %s;
+-- 6. Free up the slot held by the cancelled appointment
+UPDATE Slot 
+SET is_booked = FALSE, appointment_id = NULL 
+WHERE appointment_id = %s;
 
 
 -- 7. Get all specializations
@@ -71,21 +73,28 @@ FROM Doctor
 WHERE specialization_id = %s;
 
 
--- 9. Get available time slots for selected doctor
-SELECT * 
-FROM Schedule 
-WHERE doctor_id = %s AND is_booked = FALSE;
+-- 9. Get available time slots for selected doctor in a date range (not yet started)
+SELECT slot_id, slot_date, start_time, end_time
+FROM Slot
+WHERE doctor_id = %s
+  AND slot_date >= %s
+  AND slot_date <= %s
+  AND is_booked = FALSE
+  AND TIMESTAMP(slot_date, start_time) > NOW()
+ORDER BY slot_date, start_time;
 
 
--- 10. Create new appointment
+-- 10. Create new appointment for a claimed slot
 INSERT INTO Appointment (patient_id, schedule_id, reason_for_visit, appointment_datetime, status) 
-VALUES (%s, %s, %s, %s, 'scheduled');
+SELECT %s, schedule_id, %s, TIMESTAMP(slot_date, start_time), 'scheduled'
+FROM Slot
+WHERE slot_id = %s;
 
 
--- 11. Mark schedule slot as booked
-UPDATE Schedule 
+-- 11. Claim a slot (affects 0 rows if it was already booked or has started)
+UPDATE Slot 
 SET is_booked = TRUE 
-WHERE schedule_id = %s;
+WHERE slot_id = %s AND is_booked = FALSE AND TIMESTAMP(slot_date, start_time) > NOW();
 
 
 -- 12. Get current patient information
@@ -97,4 +106,12 @@ WHERE patient_id = %s;
 -- 13. Update patient contact information
 UPDATE Patient 
 SET phone_number = %s, email = %s, address = %s 
-WHERE patient_id = %s;
\ No newline at end of file
+WHERE patient_id = %s;
+
+
+-- 14. Search patient by date of birth and name prefix (login)
+SELECT patient_id, first_name, last_name, phone_number, email 
+FROM Patient 
+WHERE dob = %s AND (last_name LIKE %s OR first_name LIKE %s)
+ORDER BY last_name, first_name, patient_id
+LIMIT %s;
@@ -1,53 +1,1087 @@
+import hashlib
+import logging
 import os
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import copy_context
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
 import mysql.connector
 from dotenv import load_dotenv
 from mysql.connector import Error
+from mysql.connector.errors import InterfaceError, OperationalError, PoolError
 
 load_dotenv()
 
+# Connection pool settings (see README)
+POOL_SIZE = int(os.getenv("MYSQL_POOL_SIZE", "5"))
+POOL_TIMEOUT = float(os.getenv("MYSQL_POOL_TIMEOUT", "10"))
+POOL_RECYCLE = float(os.getenv("MYSQL_POOL_RECYCLE", "3600"))
+POOL_PING_INTERVAL = float(os.getenv("MYSQL_POOL_PING_INTERVAL", "30"))
+
+# Read replica settings (see README)
+REPLICA_HOSTS = [h.strip() for h in os.getenv("MYSQL_REPLICA_HOSTS", "").split(",") if h.strip()]
+REPLICA_MAX_LAG = float(os.getenv("MYSQL_REPLICA_MAX_LAG", "5"))
+REPLICA_CHECK_INTERVAL = float(os.getenv("MYSQL_REPLICA_CHECK_INTERVAL", "5"))
+REPLICA_CONNECT_TIMEOUT = int(os.getenv("MYSQL_REPLICA_CONNECT_TIMEOUT", "2"))
+
+# Query result cache settings (see README)
+CACHE_MAX_ENTRIES = int(os.getenv("QUERY_CACHE_MAX_ENTRIES", "512"))
+CACHE_MAX_ROWS = int(os.getenv("QUERY_CACHE_MAX_ROWS", "10000"))
+
+# Query instrumentation settings (see README)
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "500"))
+SLOW_QUERY_LOG = os.getenv("SLOW_QUERY_LOG")
+SLOW_QUERY_EXPLAIN_INTERVAL = float(os.getenv("SLOW_QUERY_EXPLAIN_INTERVAL", "60"))
+METRICS_PORT = os.getenv("METRICS_PORT")
+
+
+def _connect(host=None, **options):
+    """Open a new MySQL connection (to MYSQL_HOST unless host is given), raising on failure."""
+    return mysql.connector.connect(
+        host=host or os.getenv("MYSQL_HOST"),
+        user=os.getenv("MYSQL_USER"),
+        password=os.getenv("MYSQL_PASSWORD"),
+        database=os.getenv("MYSQL_DATABASE"),
+        **options,
+    )
 
-def get_connection():
-    """Create and return a MySQL database connection."""
+
+def get_connection(**options):
+    """Create and return a MySQL database connection (extra connector options are passed through)."""
     try:
-        conn = mysql.connector.connect(
-            host=os.getenv("MYSQL_HOST"),
-            user=os.getenv("MYSQL_USER"),
-            password=os.getenv("MYSQL_PASSWORD"),
-            database=os.getenv("MYSQL_DATABASE"),
-        )
-        return conn
+        return _connect(**options)
     except Error as e:
         print(f"Error connecting to MySQL: {e}")
         return None
 
 
-def run_query(query, params=None, fetch=False):
-    """Execute an SQL query. If fetch is True, return all rows as a list of dicts. if not commit the query and return None."""
-    conn = get_connection()
-    if conn is None:
+class _PooledConnection:
+    """A connection plus the timestamps the pool needs for health checks."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+
+class ConnectionPool:
+    """Thread-safe pool of MySQL connections shared by the whole process.
+
+    Connections are opened lazily up to `size`. When all are in use, callers
+    wait up to `timeout` seconds. Idle connections are pinged before reuse
+    (reconnecting if the server dropped them) and replaced after `recycle`
+    seconds so they never outlive the server's wait_timeout.
+    """
+
+    def __init__(
+        self,
+        connect=_connect,
+        size=POOL_SIZE,
+        timeout=POOL_TIMEOUT,
+        recycle=POOL_RECYCLE,
+        ping_interval=POOL_PING_INTERVAL,
+    ):
+        self._connect = connect
+        self.size = size
+        self.timeout = timeout
+        self.recycle = recycle
+        self.ping_interval = ping_interval
+        self._idle = []
+        self._open = 0
+        self._cond = threading.Condition()
+        self._stats = {
+            "checkouts": 0,
+            "waits": 0,
+            "wait_time_total": 0.0,
+            "wait_time_max": 0.0,
+            "timeouts": 0,
+            "created": 0,
+            "recycled": 0,
+            "reconnects": 0,
+            "discarded": 0,
+        }
+
+    def _acquire(self):
+        start = time.monotonic()
+        deadline = start + self.timeout
+        waited = False
+        with self._cond:
+            while True:
+                if self._idle:
+                    entry = self._idle.pop()
+                    break
+                if self._open < self.size:
+                    self._open += 1
+                    entry = None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats["timeouts"] += 1
+                    raise PoolError(
+                        f"No connection available within {self.timeout}s "
+                        f"(pool size {self.size})"
+                    )
+                waited = True
+                self._cond.wait(remaining)
+
+            wait_time = time.monotonic() - start
+            self._stats["checkouts"] += 1
+            if waited:
+                self._stats["waits"] += 1
+            self._stats["wait_time_total"] += wait_time
+            self._stats["wait_time_max"] = max(self._stats["wait_time_max"], wait_time)
+
+        try:
+            if entry is None:
+                return self._create()
+            return self._check(entry)
+        except Exception:
+            if entry is not None:
+                self._close(entry)
+            self._forget()
+            raise
+
+    def _create(self):
+        entry = _PooledConnection(self._connect())
+        with self._cond:
+            self._stats["created"] += 1
+        return entry
+
+    def _check(self, entry):
+        """Make sure an idle connection is still usable before handing it out."""
+        now = time.monotonic()
+        if now - entry.created_at > self.recycle:
+            self._close(entry)
+            with self._cond:
+                self._stats["recycled"] += 1
+            return self._create()
+        if now - entry.last_used > self.ping_interval and not entry.conn.is_connected():
+            entry.conn.reconnect(attempts=2, delay=0)
+            entry.created_at = time.monotonic()
+            with self._cond:
+                self._stats["reconnects"] += 1
+        return entry
+
+    def _release(self, entry, broken=False):
+        if not broken:
+            try:
+                # A stream abandoned half-way still has rows on the wire;
+                # dropping the connection is cheaper than draining them
+                if entry.conn.unread_result:
+                    raise Error("Unread result found")
+                # Never hand a half-open transaction (or a stale read
+                # snapshot) to the next caller
+                if entry.conn.in_transaction:
+                    entry.conn.rollback()
+            except Error:
+                broken = True
+
+        if broken:
+            self._close(entry)
+            with self._cond:
+                self._stats["discarded"] += 1
+            self._forget()
+            return
+
+        entry.last_used = time.monotonic()
+        with self._cond:
+            self._idle.append(entry)
+            self._cond.notify()
+
+    def _forget(self):
+        """Give back the slot of a connection that was closed or never opened."""
+        with self._cond:
+            self._open -= 1
+            self._cond.notify()
+
+    @staticmethod
+    def _close(entry):
+        try:
+            entry.conn.close()
+        except Error:
+            pass
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection for the duration of a `with` block."""
+        entry = self._acquire()
+        broken = False
+        try:
+            yield entry.conn
+        except Error:
+            broken = not entry.conn.is_connected()
+            raise
+        finally:
+            self._release(entry, broken)
+
+    def stats(self):
+        """Snapshot of pool usage and wait metrics."""
+        with self._cond:
+            return {
+                "size": self.size,
+                "open": self._open,
+                "idle": len(self._idle),
+                "in_use": self._open - len(self._idle),
+                **self._stats,
+            }
+
+    def close(self):
+        """Close every idle connection; borrowed ones are left to their callers."""
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._open -= len(idle)
+        for entry in idle:
+            self._close(entry)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Return the process-wide connection pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool()
+    return _pool
+
+
+def configure_pool(**settings):
+    """Replace the process-wide pool, e.g. to size it for a CLI run.
+
+    Accepts the ConnectionPool keyword arguments; unspecified ones keep
+    their env-derived defaults.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+        _pool = ConnectionPool(**settings)
+    return _pool
+
+
+def pool_stats():
+    """Usage and wait metrics of the process-wide connection pool."""
+    return get_pool().stats()
+
+
+class Replica:
+    """One read replica: its own connection pool plus the last measured lag."""
+
+    def __init__(self, address, connect_timeout=REPLICA_CONNECT_TIMEOUT, **pool_settings):
+        host, _, port = address.partition(":")
+        options = {"host": host, "port": int(port)} if port else {"host": host}
+        # An unreachable replica must fail fast; the primary can take the read instead
+        options["connection_timeout"] = connect_timeout
+        self.name = address
+        self.pool = ConnectionPool(connect=partial(_connect, **options), **pool_settings)
+        self.lag = None  # seconds behind the primary; None = unknown or not replicating
+        self.checked_at = float("-inf")
+        self.error = None
+        self.reads = 0
+
+
+class ReplicaRouter:
+    """Sends reads to the least busy replica that is keeping up with the primary.
+
+    A replica's lag (SHOW REPLICA STATUS) is re-measured on a background
+    thread at most every `check_interval` seconds; a replica takes reads
+    only once a check has found it healthy, and one that is more than
+    `max_lag` behind, not replicating or unreachable gets none until a
+    later check finds it healthy again. For read-your-writes, a read of any table written through
+    this process within the last max_lag + check_interval seconds goes to
+    the primary. Writes from other processes are not tracked. With no
+    healthy replica every read falls back to the primary.
+    """
+
+    def __init__(
+        self,
+        addresses=(),
+        max_lag=REPLICA_MAX_LAG,
+        check_interval=REPLICA_CHECK_INTERVAL,
+        **pool_settings,
+    ):
+        self.replicas = [Replica(address, **pool_settings) for address in addresses]
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._writes = {}  # table -> monotonic time of its last write
+        self._next = 0
+        self.primary_reads = 0
+        # Lag checks run here, so a slow or unreachable replica never stalls a read
+        self._checker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="replica-lag")
+
+    def note_writes(self, tables):
+        """Pin reads of these tables to the primary until replicas have caught up."""
+        if not tables or not self.replicas:
+            return
+        now = time.monotonic()
+        with self._lock:
+            for table in tables:
+                self._writes[table] = now
+
+    def _recently_written(self, query):
+        horizon = time.monotonic() - (self.max_lag + self.check_interval)
+        with self._lock:
+            return any(self._writes.get(t, horizon) > horizon for t in read_tables(query))
+
+    def _refresh(self, replica):
+        """Schedule a lag check if one is due; reads keep using the last measurement."""
+        now = time.monotonic()
+        with self._lock:
+            if now - replica.checked_at < self.check_interval:
+                return
+            replica.checked_at = now  # one check in flight per replica
+        self._checker.submit(self._measure, replica)
+
+    def _measure(self, replica):
+        try:
+            with replica.pool.connection() as conn:
+                cursor = conn.cursor(dictionary=True)
+                try:
+                    cursor.execute("SHOW REPLICA STATUS")
+                    channels = cursor.fetchall()
+                finally:
+                    cursor.close()
+            lags = [row.get("Seconds_Behind_Source") for row in channels]
+            replica.lag = max(lags) if lags and None not in lags else None
+            replica.error = None if replica.lag is not None else "not replicating"
+        except Error as e:
+            replica.lag, replica.error = None, str(e)
+
+    def _healthy(self, replica):
+        return replica.lag is not None and replica.lag <= self.max_lag
+
+    def choose(self, query):
+        """The replica to run a read on, or None to use the primary."""
+        if not self.replicas or self._recently_written(query):
+            return self._use_primary()
+        for replica in self.replicas:
+            self._refresh(replica)
+        candidates = [r for r in self.replicas if self._healthy(r)]
+        if not candidates:
+            return self._use_primary()
+        with self._lock:
+            start = self._next % len(candidates)
+            self._next += 1
+        # Least busy wins; rotating the start spreads ties round-robin
+        ordered = candidates[start:] + candidates[:start]
+        replica = min(ordered, key=lambda r: r.pool.stats()["in_use"])
+        with self._lock:
+            replica.reads += 1
+        return replica
+
+    def _use_primary(self):
+        with self._lock:
+            self.primary_reads += 1
         return None
 
-    try:
-        cursor = conn.cursor(dictionary=True)  # Returns results as dictionaries
-        cursor.execute(query, params or ())
+    def mark_down(self, replica, error):
+        """Take a replica out of rotation until its next lag check."""
+        with self._lock:
+            replica.lag, replica.error = None, str(error)
+            replica.checked_at = time.monotonic()
 
-        if fetch:
-            results = cursor.fetchall()
-            cursor.close()
-            conn.close()
-            return results
-        else:
-            conn.commit()
-            cursor.close()
-            conn.close()
-            return None
+    def stats(self):
+        """Lag, health and read counts per replica, plus reads kept on the primary."""
+        with self._lock:
+            return {
+                "primary_reads": self.primary_reads,
+                "replicas": [
+                    {
+                        "name": r.name,
+                        "lag": r.lag,
+                        "healthy": self._healthy(r),
+                        "error": r.error,
+                        "reads": r.reads,
+                        "in_use": r.pool.stats()["in_use"],
+                    }
+                    for r in self.replicas
+                ],
+            }
+
+    def close(self):
+        self._checker.shutdown(wait=False, cancel_futures=True)
+        for replica in self.replicas:
+            replica.pool.close()
+
+
+_replicas = None
+
+
+def get_replicas():
+    """Return the process-wide replica router (built from MYSQL_REPLICA_HOSTS on first use)."""
+    global _replicas
+    if _replicas is None:
+        with _pool_lock:
+            if _replicas is None:
+                _replicas = ReplicaRouter(REPLICA_HOSTS)
+    return _replicas
+
+
+def configure_replicas(addresses, **settings):
+    """Replace the process-wide replica router, e.g. to point a CLI run at other hosts.
+
+    `addresses` are "host" or "host:port" strings; other keyword arguments
+    go to ReplicaRouter (max_lag, check_interval) or each replica's pool.
+    """
+    global _replicas
+    with _pool_lock:
+        if _replicas is not None:
+            _replicas.close()
+        _replicas = ReplicaRouter(addresses, **settings)
+    return _replicas
+
+
+def replica_stats():
+    """Lag, health and read routing counters of the replica router."""
+    return get_replicas().stats()
+
+
+def _read_pool(query, primary=False):
+    """(replica or None, pool) to run a read on."""
+    replica = None if primary else get_replicas().choose(query)
+    return replica, replica.pool if replica else get_pool()
+
+
+def _replica_failed(replica, error):
+    """Take the replica out of rotation if `error` was a connection failure on it.
+
+    Returns True if so, meaning the read is worth retrying on the primary.
+    A bad statement says nothing about the replica and returns False.
+    """
+    if replica and isinstance(error, (InterfaceError, OperationalError, PoolError)):
+        get_replicas().mark_down(replica, error)
+        return True
+    return False
+
+
+_WRITE_TARGET = re.compile(
+    r"^\s*(?:INSERT\s+(?:IGNORE\s+)?INTO|REPLACE\s+INTO|UPDATE|DELETE\s+FROM|TRUNCATE\s+(?:TABLE\s+)?)\s*`?(\w+)",
+    re.IGNORECASE,
+)
+_TABLE_REFERENCE = re.compile(r"\b(?:FROM|JOIN)\s+`?(\w+)", re.IGNORECASE)
+
+
+def normalize_sql(query):
+    """Collapse whitespace so formatting differences share one cache entry."""
+    return " ".join(query.split())
+
+
+# Tables kept up to date by triggers (migration 003) when the key table is written
+_TRIGGER_WRITES = {
+    "appointment": {"appointmentsummary"},
+    "invoice": {"revenuesummary"},
+}
+
+
+def written_tables(query):
+    """Tables a write statement modifies, including through triggers (empty for reads)."""
+    match = _WRITE_TARGET.match(query)
+    if not match:
+        return set()
+    table = match.group(1).lower()
+    return {table} | _TRIGGER_WRITES.get(table, set())
+
+
+def read_tables(query):
+    """Tables a SELECT reads from."""
+    return {name.lower() for name in _TABLE_REFERENCE.findall(query)}
+
+
+class QueryCache:
+    """Bounded LRU cache of SELECT results, tagged by the tables they read.
+
+    Entries are keyed by (normalized SQL, params) and expire after the TTL
+    given when they were stored. Any write that goes through run_query or
+    transaction() drops every entry tagged with the table it modified and
+    bumps that table's generation, so a read that was already running when
+    the write landed is not stored afterwards with its old rows.
+    The cache is per process, which matches Streamlit's single server process.
+    """
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES, max_rows=CACHE_MAX_ROWS):
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        self._entries = OrderedDict()  # key -> (expires_at, rows, tables)
+        self._generations = {}  # table -> number of invalidations so far
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    @staticmethod
+    def key(query, params):
+        return normalize_sql(query), tuple(params or ())
+
+    def get(self, key):
+        """Cached rows for key, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return list(entry[1])
+
+    def generation(self, key):
+        """Token to take before running a query and hand to put() with its rows."""
+        tables = sorted(read_tables(key[0]))
+        with self._lock:
+            return tuple(self._generations.get(t, 0) for t in tables)
+
+    def put(self, key, rows, ttl, generation=None):
+        """Store rows, unless a table they read was written since `generation` was taken."""
+        if len(rows) > self.max_rows:
+            return
+        tables = read_tables(key[0])
+        with self._lock:
+            current = tuple(self._generations.get(t, 0) for t in sorted(tables))
+            if generation is not None and generation != current:
+                return
+            self._entries[key] = (time.monotonic() + ttl, list(rows), tables)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def invalidate(self, tables):
+        """Drop every entry that read from any of `tables`."""
+        if not tables:
+            return
+        with self._lock:
+            for table in tables:
+                self._generations[table] = self._generations.get(table, 0) + 1
+            stale = [k for k, entry in self._entries.items() if entry[2] & tables]
+            for k in stale:
+                del self._entries[k]
+            self._stats["invalidations"] += len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Snapshot of hit/miss counters and current size."""
+        with self._lock:
+            return {"entries": len(self._entries), **self._stats}
+
+
+query_cache = QueryCache()
+
+
+def cache_stats():
+    """Hit/miss counters of the process-wide query cache."""
+    return query_cache.stats()
+
+
+_STRING_LITERAL = re.compile(r"'(?:[^'\\]|\\.|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_VALUE_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_PAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pages")
+
+slow_query_log = logging.getLogger("clinic.slow_query")
+if SLOW_QUERY_LOG:
+    _handler = logging.FileHandler(SLOW_QUERY_LOG)
+    _handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+    slow_query_log.addHandler(_handler)
+    slow_query_log.setLevel(logging.INFO)
+
+
+def fingerprint_sql(query):
+    """Stable id for a statement shape: literals and placeholders become `?`."""
+    shape = _STRING_LITERAL.sub("?", normalize_sql(query))
+    shape = _NUMBER_LITERAL.sub("?", shape.replace("%s", "?"))
+    shape = _VALUE_LIST.sub("(?+)", shape)
+    return hashlib.sha1(shape.encode()).hexdigest()[:12], shape
+
+
+def _calling_function():
+    """The page function (or, failing that, the first function outside db_utils) that issued a query."""
+    frame = sys._getframe(1)
+    fallback = None
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename != __file__ and "contextlib" not in filename:
+            caller = f"{os.path.splitext(os.path.basename(filename))[0]}.{frame.f_code.co_name}"
+            if os.path.dirname(os.path.abspath(filename)) == _PAGES_DIR:
+                return caller
+            fallback = fallback or caller
+        frame = frame.f_back
+    return fallback or "unknown"
+
+
+_thread_caller = threading.local()
+
+
+class _QueryTimer:
+    """Times the phases of one statement and reports them to query_stats."""
+
+    PHASES = ("connect", "execute", "fetch")
+
+    def __init__(self, query, params, phase="connect"):
+        self.query = query
+        self.params = params
+        # Worker threads of run_query_async report the function that submitted the query
+        self.caller = getattr(_thread_caller, "name", None) or _calling_function()
+        self.phases = dict.fromkeys(self.PHASES, 0.0)
+        self.rows = 0
+        self.failed = False
+        self._current = phase
+        self._last = time.perf_counter()
+
+    def mark(self, phase):
+        """Charge the time since the previous mark to `phase`."""
+        now = time.perf_counter()
+        self.phases[phase] += now - self._last
+        self._last = now
+        self._current = self.PHASES[min(self.PHASES.index(phase) + 1, len(self.PHASES) - 1)]
+
+    def resume(self):
+        """Restart the clock after time that should not be charged (e.g. a consumer between batches)."""
+        self._last = time.perf_counter()
+
+    def done(self):
+        if self.failed:
+            self.mark(self._current)
+        query_stats.record(self)
+
+
+class QueryStats:
+    """Per (fingerprint, caller) counters for every statement run through db_utils.
+
+    Statements slower than SLOW_QUERY_MS are written to the `clinic.slow_query`
+    logger. A slow SELECT also gets its EXPLAIN plan, at most once per
+    fingerprint every `explain_interval` seconds; the EXPLAIN and the log
+    write happen on a background thread, never on the slow request itself.
+    """
+
+    def __init__(self, slow_ms=SLOW_QUERY_MS, explain_interval=SLOW_QUERY_EXPLAIN_INTERVAL):
+        self.slow_ms = slow_ms
+        self.explain_interval = explain_interval
+        self._explained = {}  # fingerprint -> monotonic time of its last EXPLAIN
+        self._explainer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slow-query")
+        self.listeners = []  # called with (timer, total seconds) after every statement
+        self._lock = threading.Lock()
+        self._stats = {}  # (fingerprint, caller) -> counters
+        self._shapes = {}  # fingerprint -> normalized statement
+
+    def record(self, timer):
+        fingerprint, shape = fingerprint_sql(timer.query)
+        total = sum(timer.phases.values())
+        for listener in self.listeners:
+            listener(timer, total)
+        slow = total * 1000 >= self.slow_ms
+        with self._lock:
+            self._shapes[fingerprint] = shape
+            stats = self._stats.setdefault(
+                (fingerprint, timer.caller),
+                {
+                    "calls": 0,
+                    "errors": 0,
+                    "slow": 0,
+                    "rows": 0,
+                    "seconds": 0.0,
+                    "max_seconds": 0.0,
+                    **{f"{phase}_seconds": 0.0 for phase in timer.phases},
+                },
+            )
+            stats["calls"] += 1
+            stats["errors"] += timer.failed
+            stats["slow"] += slow
+            stats["rows"] += max(timer.rows, 0)
+            stats["seconds"] += total
+            stats["max_seconds"] = max(stats["max_seconds"], total)
+            for phase, seconds in timer.phases.items():
+                stats[f"{phase}_seconds"] += seconds
+        if slow:
+            self._log_slow(timer, fingerprint, total)
+
+    def _log_slow(self, timer, fingerprint, total):
+        phases = ", ".join(f"{p} {s * 1000:.1f}ms" for p, s in timer.phases.items())
+        message = (
+            f"slow query {fingerprint} from {timer.caller}: {total * 1000:.1f}ms "
+            f"({phases}), {timer.rows} row(s)\n  {normalize_sql(timer.query)}\n"
+            f"  params: {timer.params!r}"
+        )
+        explain = False
+        if timer.query.lstrip()[:6].upper() == "SELECT":
+            now = time.monotonic()
+            with self._lock:
+                if now - self._explained.get(fingerprint, float("-inf")) >= self.explain_interval:
+                    self._explained[fingerprint] = now
+                    explain = True
+        self._explainer.submit(self._write_slow, message, timer.query, timer.params, explain)
+
+    @staticmethod
+    def _write_slow(message, query, params, explain):
+        if explain:
+            # Unpooled, so EXPLAINs never compete with requests for pooled connections
+            conn = get_connection()
+            if conn:
+                try:
+                    cursor = conn.cursor(dictionary=True)
+                    cursor.execute(f"EXPLAIN {query}", params or ())
+                    for step in cursor.fetchall():
+                        message += (
+                            f"\n  explain: {step['table']} type={step['type']} "
+                            f"key={step['key']} rows={step['rows']} {step['Extra'] or ''}"
+                        )
+                    cursor.close()
+                except Error as e:
+                    message += f"\n  explain failed: {e}"
+                finally:
+                    conn.close()
+        slow_query_log.warning(message)
+
+    def snapshot(self):
+        """Counters as a list of dicts, busiest statements first."""
+        with self._lock:
+            rows = [
+                {"fingerprint": fp, "caller": caller, "query": self._shapes[fp], **stats}
+                for (fp, caller), stats in self._stats.items()
+            ]
+        return sorted(rows, key=lambda row: row["seconds"], reverse=True)
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self._shapes.clear()
+
+
+query_stats = QueryStats()
+
+
+def run_query(query, params=None, fetch=False, cache_ttl=None, primary=False):
+    """Execute an SQL query. If fetch is True, return all rows as a list of dicts. if not commit the query and return None.
+
+    With cache_ttl (seconds), fetched rows are served from the query cache
+    until they expire or a write touches one of the tables they read.
+    Cached rows are shared, so treat them as read-only.
+    Fetches go to a read replica when one is configured and healthy;
+    pass primary=True for reads that must see the very latest data.
+    """
+    cache_key = None
+    if fetch and cache_ttl:
+        cache_key = QueryCache.key(query, params)
+        cached = query_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        generation = query_cache.generation(cache_key)
+
+    else:
+        generation = None
+
+    replica, pool = _read_pool(query, primary) if fetch else (None, get_pool())
+    try:
+        try:
+            return _run_on(pool, query, params, fetch, cache_key, cache_ttl, generation)
+        except Error as e:
+            # A replica that dropped off is skipped from now on; this read goes to the primary
+            if not _replica_failed(replica, e):
+                raise
+            return _run_on(get_pool(), query, params, fetch, cache_key, cache_ttl, generation)
     except Error as e:
         print(f"Error executing query: {e}")
-        if conn:
-            conn.close()
         return None
 
 
+def _run_on(pool, query, params, fetch, cache_key, cache_ttl, generation):
+    """run_query's work on one pool, raising database errors."""
+    timer = _QueryTimer(query, params)
+    try:
+        with pool.connection() as conn:
+            timer.mark("connect")
+            cursor = conn.cursor(dictionary=True)  # Returns results as dictionaries
+            try:
+                cursor.execute(query, params or ())
+                if fetch:
+                    timer.mark("execute")
+                    results = cursor.fetchall()
+                    timer.mark("fetch")
+                    timer.rows = len(results)
+                    if cache_key:
+                        query_cache.put(cache_key, results, cache_ttl, generation)
+                    return results
+                conn.commit()
+                timer.mark("execute")
+                timer.rows = cursor.rowcount
+                tables = written_tables(query)
+                query_cache.invalidate(tables)
+                get_replicas().note_writes(tables)
+                return None
+            finally:
+                cursor.close()
+    except Error:
+        timer.failed = True
+        raise
+    finally:
+        timer.done()
+
+
+def stream_query(query, params=None, batch_size=1000, primary=False):
+    """Execute a SELECT and yield its rows in lists of at most batch_size dicts.
+
+    Uses an unbuffered cursor, so rows stay on the server until fetched and
+    memory is bounded by one batch. The connection is held until the
+    generator is exhausted or closed; unlike run_query, errors are raised.
+    Routed to a read replica like run_query fetches; if the replica fails
+    before the first batch, the stream restarts on the primary.
+    """
+    replica, pool = _read_pool(query, primary)
+    while True:
+        timer = _QueryTimer(query, params)
+        started = False
+        try:
+            with pool.connection() as conn:
+                timer.mark("connect")
+                cursor = conn.cursor(dictionary=True)  # unbuffered by default
+                cursor.execute(query, params or ())
+                timer.mark("execute")
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    # Time spent by the consumer between batches is not ours
+                    timer.mark("fetch")
+                    if not rows:
+                        break
+                    timer.rows += len(rows)
+                    started = True
+                    yield rows
+                    timer.resume()
+                cursor.close()
+            return
+        except Error as e:
+            timer.failed = True
+            # Rows already handed out cannot be replayed, so retry only before the first batch
+            if not _replica_failed(replica, e) or started:
+                raise
+            replica, pool = None, get_pool()
+        finally:
+            timer.done()
+
+
+_query_executor = None
+
+
+def _executor():
+    global _query_executor
+    if _query_executor is None:
+        with _pool_lock:
+            if _query_executor is None:
+                _query_executor = ThreadPoolExecutor(max_workers=POOL_SIZE, thread_name_prefix="query")
+    return _query_executor
+
+
+def _run_for(caller, *args, **kwargs):
+    _thread_caller.name = caller
+    try:
+        return run_query(*args, **kwargs)
+    finally:
+        _thread_caller.name = None
+
+
+def run_query_async(query, params=None, fetch=False, cache_ttl=None, primary=False):
+    """Start run_query on a worker thread and return its concurrent.futures.Future.
+
+    Workers are shared by the process and capped at MYSQL_POOL_SIZE, so
+    concurrent queries never outnumber pooled connections. The query runs
+    in a copy of the caller's context, so context-bound state such as the
+    render profiler's active span follows it. The future's result is
+    whatever run_query returns (None on a database error).
+    """
+    caller = _calling_function()
+    return _executor().submit(
+        copy_context().run,
+        _run_for,
+        caller,
+        query,
+        params,
+        fetch=fetch,
+        cache_ttl=cache_ttl,
+        primary=primary,
+    )
+
+
+def run_queries_parallel(queries, cache_ttl=None, primary=False):
+    """Fetch several independent queries at once, each on its own pooled connection.
+
+    `queries` is a list of SQL strings or (query, params) pairs. Returns
+    their rows in the same order, with None for any query that failed, so
+    a view of N queries waits for the slowest one rather than all of them.
+    """
+    futures = [
+        run_query_async(
+            *(query if isinstance(query, tuple) else (query,)),
+            fetch=True,
+            cache_ttl=cache_ttl,
+            primary=primary,
+        )
+        for query in queries
+    ]
+    return [future.result() for future in futures]
+
+
+class Transaction:
+    """Statement runner handed out by `transaction()`."""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self.lastrowid = None
+        self.written_tables = set()
+
+    def execute(self, query, params=None, fetch=False):
+        """Execute an SQL statement in the transaction. If fetch is True, return all rows as a list of dicts, otherwise return the affected row count."""
+        timer = _QueryTimer(query, params, phase="execute")
+        try:
+            self._cursor.execute(query, params or ())
+            timer.mark("execute")
+            if fetch:
+                rows = self._cursor.fetchall()
+                timer.mark("fetch")
+                timer.rows = len(rows)
+                return rows
+            self.written_tables |= written_tables(query)
+            self.lastrowid = self._cursor.lastrowid
+            timer.rows = self._cursor.rowcount
+            return self._cursor.rowcount
+        except Error:
+            timer.failed = True
+            raise
+        finally:
+            timer.done()
+
+
+@contextmanager
+def transaction():
+    """Run several statements on one connection with a single commit.
+
+    Commits when the `with` block exits normally; on any exception the
+    transaction is rolled back and the exception re-raised, so callers never
+    leave half-applied writes behind.
+    """
+    with get_pool().connection() as conn:
+        cursor = conn.cursor(dictionary=True)
+        tx = Transaction(cursor)
+        try:
+            yield tx
+            conn.commit()
+            query_cache.invalidate(tx.written_tables)
+            get_replicas().note_writes(tx.written_tables)
+        except BaseException:
+            try:
+                conn.rollback()
+            except Error:
+                pass  # the original exception is the one worth reporting
+            raise
+        finally:
+            cursor.close()
+
+
+def prometheus_metrics():
+    """Query, pool and cache counters in the Prometheus text exposition format."""
+
+    def label(value):
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+    lines = []
+
+    def metric(name, kind, help_text, samples):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in samples:
+            rendered = ",".join(f'{k}="{label(v)}"' for k, v in labels.items())
+            lines.append(f"{name}{{{rendered}}} {value}" if rendered else f"{name} {value}")
+
+    stats = query_stats.snapshot()
+    keys = [{"fingerprint": row["fingerprint"], "caller": row["caller"]} for row in stats]
+    metric("clinic_db_queries_total", "counter", "Statements executed.",
+           [(k, row["calls"]) for k, row in zip(keys, stats)])
+    metric("clinic_db_query_errors_total", "counter", "Statements that raised a database error.",
+           [(k, row["errors"]) for k, row in zip(keys, stats)])
+    metric("clinic_db_slow_queries_total", "counter", f"Statements slower than {SLOW_QUERY_MS:g}ms.",
+           [(k, row["slow"]) for k, row in zip(keys, stats)])
+    metric("clinic_db_query_rows_total", "counter", "Rows returned or affected.",
+           [(k, row["rows"]) for k, row in zip(keys, stats)])
+    metric("clinic_db_query_seconds_total", "counter", "Time spent per phase (connect, execute, fetch).",
+           [({**k, "phase": phase}, row[f"{phase}_seconds"])
+            for k, row in zip(keys, stats) for phase in ("connect", "execute", "fetch")])
+    metric("clinic_db_query_info", "gauge", "Normalized statement for each fingerprint.",
+           [({"fingerprint": fp, "query": query}, 1)
+            for fp, query in {row["fingerprint"]: row["query"] for row in stats}.items()])
+
+    pool = pool_stats()
+    for key in ("open", "idle", "in_use", "size"):
+        metric(f"clinic_db_pool_{key}", "gauge", f"Connection pool {key.replace('_', ' ')}.", [({}, pool[key])])
+    for key in ("checkouts", "waits", "timeouts", "created", "recycled", "reconnects", "discarded"):
+        metric(f"clinic_db_pool_{key}_total", "counter", f"Connection pool {key}.", [({}, pool[key])])
+    metric("clinic_db_pool_wait_seconds_total", "counter", "Time spent waiting for a pooled connection.",
+           [({}, pool["wait_time_total"])])
+
+    routing = replica_stats()
+    metric("clinic_db_primary_reads_total", "counter", "Reads kept on the primary.",
+           [({}, routing["primary_reads"])])
+    metric("clinic_db_replica_reads_total", "counter", "Reads routed to each replica.",
+           [({"replica": r["name"]}, r["reads"]) for r in routing["replicas"]])
+    metric("clinic_db_replica_healthy", "gauge", "1 if the replica receives reads.",
+           [({"replica": r["name"]}, int(r["healthy"])) for r in routing["replicas"]])
+    metric("clinic_db_replica_lag_seconds", "gauge", "Last measured replication lag.",
+           [({"replica": r["name"]}, r["lag"]) for r in routing["replicas"] if r["lag"] is not None])
+
+    cache = cache_stats()
+    metric("clinic_db_cache_entries", "gauge", "Cached query results.", [({}, cache["entries"])])
+    for key in ("hits", "misses", "evictions", "invalidations"):
+        metric(f"clinic_db_cache_{key}_total", "counter", f"Query cache {key}.", [({}, cache[key])])
+
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path != "/metrics":
+            self.send_error(404)
+            return
+        body = prometheus_metrics().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # keep scrapes out of the app's console
+
+
+_metrics_server = None
+_metrics_lock = threading.Lock()
+
+
+def start_metrics_server(port, host="127.0.0.1"):
+    """Serve prometheus_metrics() at http://host:port/metrics from a daemon thread (once per process)."""
+    global _metrics_server
+    with _metrics_lock:
+        if _metrics_server is None:
+            _metrics_server = ThreadingHTTPServer((host, int(port)), _MetricsHandler)
+            threading.Thread(target=_metrics_server.serve_forever, daemon=True).start()
+    return _metrics_server
+
+
+if METRICS_PORT:
+    try:
+        start_metrics_server(METRICS_PORT)
+    except OSError as e:
+        print(f"Could not start metrics server on port {METRICS_PORT}: {e}")
+
+
 # Test if database connection works
 def test_connection():
     conn = get_connection()
@@ -1,18 +1,43 @@
-import streamlit as st
-from db_utils import run_query
-
+import csv
+import io
+import os
+import tempfile
+from datetime import date
 
+import streamlit as st
+from db_utils import run_queries_parallel, run_query
+from profiler import profile_rerun, profiled
+from services.billing import invoice_eligible_appointments, mark_invoices_paid
+from services.export import EXPORTS, FORMATS, export
+from services.patient_import import (
+    COLUMNS,
+    ImportInterrupted,
+    import_patients,
+    parse_patients,
+)
+from services.search import search_patients, search_records
+
+
+@profiled(kind="state")
 def init_state():
     """Initialize admin session state"""
     defaults = {
         "admin_view": "home",
         "selected_invoice_id": None,
+        "appointments_page_filter": None,
+        "appointments_page_cursors": [None],
+        "table_page_filter": None,
+        "table_page_cursors": [None],
+        "search_filter": None,
+        "search_page": 0,
+        "invoice_view": "View All Invoices",
     }
     for key, value in defaults.items():
         if key not in st.session_state:
             st.session_state[key] = value
 
 
+@profiled
 def render_home_view():
     """Admin dashboard home with navigation"""
     st.header("Clinic Admin Portal")
@@ -44,7 +69,20 @@ def render_home_view():
             st.session_state["admin_view"] = "invoices"
             st.rerun()
 
+        if st.button("Search Patients & Records", use_container_width=True):
+            st.session_state["admin_view"] = "search"
+            st.rerun()
+
+        if st.button("Export Data", use_container_width=True):
+            st.session_state["admin_view"] = "export"
+            st.rerun()
+
+    if st.button("Import Patients", use_container_width=True):
+        st.session_state["admin_view"] = "import"
+        st.rerun()
+
 
+@profiled
 def render_dashboard():
     """Analytics dashboard with appointment and revenue summary"""
     if st.button("← Back to Home"):
@@ -54,16 +92,46 @@ def render_dashboard():
     st.header("Clinic Dashboard")
     st.divider()
 
+    # The three sections are independent, so load them concurrently.
+    # Summary tables are kept current by triggers (migration 003)
+    appointment_summary, revenue_data, recent_appointments = run_queries_parallel(
+        [
+            """
+            SELECT status, appointment_count as count
+            FROM AppointmentSummary
+            WHERE appointment_count > 0
+            ORDER BY status
+            """,
+            """
+            SELECT 
+                SUM(CASE WHEN status = 'paid' THEN total_amount ELSE 0 END) as total_paid,
+                SUM(CASE WHEN status = 'unpaid' THEN total_amount ELSE 0 END) as total_unpaid,
+                SUM(total_amount) as total_revenue
+            FROM RevenueSummary
+            """,
+            """
+            SELECT 
+                a.appointment_datetime,
+                p.first_name as patient_first,
+                p.last_name as patient_last,
+                d.first_name as doctor_first,
+                d.last_name as doctor_last,
+                a.reason_for_visit,
+                r.diagnosis
+            FROM Appointment a
+            JOIN Patient p ON a.patient_id = p.patient_id
+            JOIN Schedule sch ON a.schedule_id = sch.schedule_id
+            JOIN Doctor d ON sch.doctor_id = d.doctor_id
+            LEFT JOIN Record r ON a.appointment_id = r.appointment_id
+            WHERE a.status = 'completed'
+            ORDER BY a.appointment_datetime DESC
+            LIMIT 10
+            """,
+        ]
+    )
+
     # Appointment Summary
     st.subheader("Appointment Summary")
-    appointment_summary = run_query(
-        """
-        SELECT status, COUNT(*) as count
-        FROM Appointment
-        GROUP BY status
-        """,
-        fetch=True,
-    )
 
     if appointment_summary:
         cols = st.columns(len(appointment_summary))
@@ -78,17 +146,6 @@ def render_dashboard():
     # Revenue Summary
     st.subheader("Revenue Summary")
 
-    revenue_data = run_query(
-        """
-        SELECT 
-            SUM(CASE WHEN status = 'paid' THEN amount ELSE 0 END) as total_paid,
-            SUM(CASE WHEN status = 'unpaid' THEN amount ELSE 0 END) as total_unpaid,
-            SUM(amount) as total_revenue
-        FROM Invoice
-        """,
-        fetch=True,
-    )
-
     if revenue_data and revenue_data[0]["total_revenue"]:
         rev = revenue_data[0]
         col1, col2, col3 = st.columns(3)
@@ -106,28 +163,6 @@ def render_dashboard():
     # Recent Activity
     st.subheader("Recent Completed Appointments")
 
-    recent_appointments = run_query(
-        """
-        SELECT 
-            a.appointment_datetime,
-            p.first_name as patient_first,
-            p.last_name as patient_last,
-            d.first_name as doctor_first,
-            d.last_name as doctor_last,
-            a.reason_for_visit,
-            r.diagnosis
-        FROM Appointment a
-        JOIN Patient p ON a.patient_id = p.patient_id
-        JOIN Schedule sch ON a.schedule_id = sch.schedule_id
-        JOIN Doctor d ON sch.doctor_id = d.doctor_id
-        LEFT JOIN Record r ON a.appointment_id = r.appointment_id
-        WHERE a.status = 'completed'
-        ORDER BY a.appointment_datetime DESC
-        LIMIT 10
-        """,
-        fetch=True,
-    )
-
     if recent_appointments:
         for appt in recent_appointments:
             with st.expander(
@@ -143,6 +178,7 @@ def render_dashboard():
         st.info("No recent completed appointments")
 
 
+@profiled
 def render_schedules():
     """View all doctor schedules"""
     if st.button("← Back to Home"):
@@ -161,10 +197,13 @@ def render_schedules():
             sch.available_day,
             sch.start_time,
             sch.end_time,
-            sch.is_booked
+            COUNT(sl.slot_id) AS upcoming_slots,
+            IFNULL(SUM(sl.is_booked), 0) AS booked_slots
         FROM Schedule sch
         JOIN Doctor d ON sch.doctor_id = d.doctor_id
         JOIN Specialization s ON d.specialization_id = s.specialization_id
+        LEFT JOIN Slot sl ON sl.schedule_id = sch.schedule_id AND sl.slot_date >= CURDATE()
+        GROUP BY sch.schedule_id
         ORDER BY d.doctor_id, sch.available_day, sch.start_time
         """,
         fetch=True,
@@ -188,26 +227,39 @@ def render_schedules():
             with col2:
                 st.write(f"{schedule['start_time']} - {schedule['end_time']}")
             with col3:
-                if schedule["is_booked"]:
-                    st.markdown(":red[**Booked**]")
+                booked, upcoming = schedule["booked_slots"], schedule["upcoming_slots"]
+                if upcoming and booked >= upcoming:
+                    st.markdown(":red[**Fully booked**]")
                 else:
-                    st.markdown(":green[**Free**]")
+                    st.markdown(f":green[**{upcoming - booked} of {upcoming} free**]")
     else:
         st.info("No schedules available")
 
 
+@profiled
 def render_appointments():
-    """View all appointments with filtering"""
+    """View all appointments with filtering, one keyset-paginated page at a time"""
     if st.button("← Back to Home"):
         st.session_state["admin_view"] = "home"
         st.rerun()
 
     st.header("All Appointments")
 
-    # Status filter
-    status_filter = st.selectbox(
-        "Filter by Status", ["All", "scheduled", "completed", "cancelled"]
-    )
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        # Status filter
+        status_filter = st.selectbox(
+            "Filter by Status", ["All", "scheduled", "completed", "cancelled"]
+        )
+    with col2:
+        page_size = st.selectbox("Per page", [20, 50, 100])
+
+    # Start from the first page whenever the filter or page size changes.
+    # Each cursor is the (datetime, id) of the last row of the previous page.
+    if st.session_state["appointments_page_filter"] != (status_filter, page_size):
+        st.session_state["appointments_page_filter"] = (status_filter, page_size)
+        st.session_state["appointments_page_cursors"] = [None]
+    cursors = st.session_state["appointments_page_cursors"]
 
     st.divider()
 
@@ -219,6 +271,27 @@ def render_appointments():
         where_clause = "WHERE a.status = %s"
         params = (status_filter,)
 
+    # Read the total from the trigger-maintained summary (migration 003):
+    # one row per status, so it costs the same however large Appointment grows
+    total = run_query(
+        "SELECT IFNULL(SUM(appointment_count), 0) AS total FROM AppointmentSummary"
+        + (" WHERE status = %s" if params else ""),
+        params,
+        fetch=True,
+    )
+    total = total[0]["total"] if total else 0
+
+    page_params = params
+    if cursors[-1] is not None:
+        last_datetime, last_id = cursors[-1]
+        seek = (
+            "(a.appointment_datetime < %s OR "
+            "(a.appointment_datetime = %s AND a.appointment_id < %s))"
+        )
+        where_clause = f"{where_clause} AND {seek}" if where_clause else f"WHERE {seek}"
+        page_params = params + (last_datetime, last_datetime, last_id)
+
+    # One extra row tells us whether there is a next page
     appointments = run_query(
         f"""
         SELECT 
@@ -238,14 +311,33 @@ def render_appointments():
         JOIN Doctor d ON sch.doctor_id = d.doctor_id
         JOIN Specialization s ON d.specialization_id = s.specialization_id
         {where_clause}
-        ORDER BY a.appointment_datetime DESC
+        ORDER BY a.appointment_datetime DESC, a.appointment_id DESC
+        LIMIT %s
         """,
-        params,
+        page_params + (page_size + 1,),
         fetch=True,
     )
 
+    has_next = bool(appointments) and len(appointments) > page_size
+    appointments = (appointments or [])[:page_size]
+
     if appointments:
-        st.write(f"**Total: {len(appointments)} appointment(s)**")
+        first_row = (len(cursors) - 1) * page_size + 1
+        st.write(
+            f"**Showing {first_row}–{first_row + len(appointments) - 1} "
+            f"of {total} appointment(s)**"
+        )
+
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("← Previous", disabled=len(cursors) == 1):
+                cursors.pop()
+                st.rerun()
+        with col2:
+            if st.button("Next →", disabled=not has_next):
+                last = appointments[-1]
+                cursors.append((last["appointment_datetime"], last["appointment_id"]))
+                st.rerun()
         st.divider()
 
         for appt in appointments:
@@ -283,6 +375,7 @@ def render_appointments():
         st.info("No appointments found")
 
 
+@profiled
 def render_invoices():
     """Manage invoices: view, create, update payment status"""
     if st.button("← Back to Home"):
@@ -291,218 +384,447 @@ def render_invoices():
 
     st.header("Invoice Management")
 
-    # Tabs for different invoice operations
-    tab1, tab2, tab3 = st.tabs(
-        ["View All Invoices", "Create Invoice", "Update Payment"]
+    # st.tabs would run every tab's queries on each rerun; only the chosen view is loaded
+    view = st.radio(
+        "View",
+        list(INVOICE_VIEWS),
+        horizontal=True,
+        key="invoice_view",
+        label_visibility="collapsed",
     )
+    st.divider()
+    INVOICE_VIEWS[view]()
 
-    # Tab 1: View All Invoices
-    with tab1:
-        st.subheader("All Invoices")
 
-        invoices = run_query(
-            """
-            SELECT 
-                i.appointment_id,
-                i.amount,
-                i.issue_date,
-                i.status,
-                p.first_name as patient_first,
-                p.last_name as patient_last,
-                a.appointment_datetime,
-                a.reason_for_visit
-            FROM Invoice i
-            JOIN Appointment a ON i.appointment_id = a.appointment_id
-            JOIN Patient p ON a.patient_id = p.patient_id
-            ORDER BY i.issue_date DESC
-            """,
-            fetch=True,
+@profiled
+def render_invoice_list():
+    """All invoices, newest first"""
+    st.subheader("All Invoices")
+
+    invoices = run_query(
+        """
+        SELECT 
+            i.appointment_id,
+            i.amount,
+            i.issue_date,
+            i.status,
+            p.first_name as patient_first,
+            p.last_name as patient_last,
+            a.appointment_datetime,
+            a.reason_for_visit
+        FROM Invoice i
+        JOIN Appointment a ON i.appointment_id = a.appointment_id
+        JOIN Patient p ON a.patient_id = p.patient_id
+        ORDER BY i.issue_date DESC
+        """,
+        fetch=True,
+    )
+
+    if invoices:
+        st.write(f"**Total: {len(invoices)} invoice(s)**")
+        st.divider()
+
+        for inv in invoices:
+            status_badge = (
+                ":green[PAID]" if inv["status"] == "paid" else ":orange[UNPAID]"
+            )
+
+            with st.expander(
+                f"Invoice #{inv['appointment_id']} - "
+                f"{inv['patient_first']} {inv['patient_last']} - "
+                f"Rp {inv['amount']:,.0f} - {status_badge}"
+            ):
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.write(
+                        f"**Patient:** {inv['patient_first']} {inv['patient_last']}"
+                    )
+                    st.write(
+                        f"**Appointment Date:** {inv['appointment_datetime'].strftime('%Y-%m-%d')}"
+                    )
+                    st.write(f"**Reason:** {inv['reason_for_visit'] or 'General'}")
+                with col2:
+                    st.write(f"**Amount:** Rp {inv['amount']:,.0f}")
+                    st.write(f"**Issue Date:** {inv['issue_date']}")
+                    st.markdown(f"**Status:** {status_badge}")
+    else:
+        st.info("No invoices found")
+
+
+@profiled
+def render_invoice_create():
+    """Bulk and single invoice creation for completed appointments"""
+    st.subheader("Invoice All Eligible")
+    st.write("Create invoices for every completed appointment without one")
+
+    with st.form("bulk_invoice_form"):
+        limit_dates = st.checkbox("Only appointments in a date range")
+        col1, col2 = st.columns(2)
+        with col1:
+            start_date = st.date_input("From")
+        with col2:
+            end_date = st.date_input("To")
+        bulk_submitted = st.form_submit_button(
+            "Invoice All Eligible", use_container_width=True
         )
 
-        if invoices:
-            st.write(f"**Total: {len(invoices)} invoice(s)**")
-            st.divider()
+    if bulk_submitted:
+        if limit_dates and start_date > end_date:
+            st.error("'From' must not be after 'To'")
+        else:
+            try:
+                result = invoice_eligible_appointments(
+                    start_date if limit_dates else None,
+                    end_date if limit_dates else None,
+                )
+                st.success(
+                    f"Created {result['created']} invoice(s) "
+                    f"in {result['seconds']:.2f}s"
+                )
+            except Exception as e:
+                st.error(f"Failed to create invoices: {e}")
 
-            for inv in invoices:
-                status_badge = (
-                    ":green[PAID]" if inv["status"] == "paid" else ":orange[UNPAID]"
+    st.divider()
+    st.subheader("Create New Invoice")
+    st.write("Create invoices for completed appointments without invoices")
+
+    # Get completed appointments without invoices + specialization fee
+    eligible_appointments = run_query(
+        """
+        SELECT 
+            a.appointment_id,
+            a.appointment_datetime,
+            a.reason_for_visit,
+            p.first_name  AS patient_first,
+            p.last_name   AS patient_last,
+            d.first_name  AS doctor_first,
+            d.last_name   AS doctor_last,
+            s.specialization_name,
+            s.consultation_fee
+        FROM Appointment a
+        JOIN Patient p        ON a.patient_id = p.patient_id
+        JOIN Schedule sch     ON a.schedule_id = sch.schedule_id
+        JOIN Doctor d         ON sch.doctor_id = d.doctor_id
+        JOIN Specialization s ON d.specialization_id = s.specialization_id
+        LEFT JOIN Invoice i   ON a.appointment_id = i.appointment_id
+        WHERE a.status = 'completed' AND i.appointment_id IS NULL
+        ORDER BY a.appointment_datetime DESC
+        """,
+        fetch=True,
+    )
+
+    if eligible_appointments:
+        st.write(f"**{len(eligible_appointments)} appointment(s) need invoices**")
+        st.divider()
+
+        with st.form("create_invoice_form"):
+            # Build option label → full row mapping
+            appointment_options = {
+                (
+                    f"#{appt['appointment_id']} - "
+                    f"{appt['patient_first']} {appt['patient_last']} → "
+                    f"Dr. {appt['doctor_first']} {appt['doctor_last']} "
+                    f"({appt['appointment_datetime'].strftime('%Y-%m-%d')}) - "
+                    f"{appt['specialization_name']} "
+                    f"(Rp {appt['consultation_fee']:,.0f})"
+                ): appt
+                for appt in eligible_appointments
+            }
+
+            selected_label = st.selectbox(
+                "Select Appointment", options=list(appointment_options.keys())
+            )
+            selected_appt = appointment_options[selected_label]
+
+            # Read-only fee information
+            st.info(
+                f"Consultation fee (from specialization): "
+                f"Rp {selected_appt['consultation_fee']:,.0f}"
+            )
+
+            submitted = st.form_submit_button(
+                "Create Invoice", use_container_width=True, type="primary"
+            )
+
+        if submitted:
+            try:
+                appointment_id = selected_appt["appointment_id"]
+                amount = selected_appt["consultation_fee"]
+
+                run_query(
+                    """
+                    INSERT INTO Invoice (appointment_id, amount, issue_date, status)
+                    VALUES (%s, %s, CURDATE(), 'unpaid')
+                    """,
+                    (appointment_id, amount),
+                )
+                st.success(
+                    f"Invoice created successfully for Appointment #{appointment_id}!"
                 )
+                st.rerun()
+            except Exception as e:
+                st.error(f"Failed to create invoice: {e}")
+    else:
+        st.info("No completed appointments need invoices")
+
+
+@profiled
+def render_invoice_payment():
+    """Mark unpaid invoices as paid, one by one or in bulk"""
+    st.subheader("Update Payment Status")
+    st.write("Mark invoices as paid")
+
+    # Get unpaid invoices
+    unpaid_invoices = run_query(
+        """
+        SELECT 
+            i.appointment_id,
+            i.amount,
+            i.issue_date,
+            p.first_name as patient_first,
+            p.last_name as patient_last,
+            a.appointment_datetime
+        FROM Invoice i
+        JOIN Appointment a ON i.appointment_id = a.appointment_id
+        JOIN Patient p ON a.patient_id = p.patient_id
+        WHERE i.status = 'unpaid'
+        ORDER BY i.issue_date
+        """,
+        fetch=True,
+    )
+
+    mode = st.radio(
+        "Mode", ["One by one", "Bulk reconcile"], horizontal=True
+    )
 
-                with st.expander(
-                    f"Invoice #{inv['appointment_id']} - "
+    if mode == "Bulk reconcile":
+        render_bulk_payment(unpaid_invoices or [])
+    elif unpaid_invoices:
+        st.write(f"**{len(unpaid_invoices)} unpaid invoice(s)**")
+        st.divider()
+
+        for inv in unpaid_invoices:
+            col1, col2 = st.columns([3, 1])
+            with col1:
+                st.write(f"**Invoice #{inv['appointment_id']}**")
+                st.write(
                     f"{inv['patient_first']} {inv['patient_last']} - "
-                    f"Rp {inv['amount']:,.0f} - {status_badge}"
+                    f"Rp {inv['amount']:,.0f}"
+                )
+                st.caption(
+                    f"Issued: {inv['issue_date']} | "
+                    f"Appointment: {inv['appointment_datetime'].strftime('%Y-%m-%d')}"
+                )
+            with col2:
+                if st.button(
+                    "Mark Paid",
+                    key=f"pay_{inv['appointment_id']}",
+                    use_container_width=True,
                 ):
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        st.write(
-                            f"**Patient:** {inv['patient_first']} {inv['patient_last']}"
+                    try:
+                        run_query(
+                            "UPDATE Invoice SET status = 'paid' WHERE appointment_id = %s",
+                            (inv["appointment_id"],),
                         )
-                        st.write(
-                            f"**Appointment Date:** {inv['appointment_datetime'].strftime('%Y-%m-%d')}"
+                        st.success(
+                            f"Invoice #{inv['appointment_id']} marked as paid!"
                         )
-                        st.write(f"**Reason:** {inv['reason_for_visit'] or 'General'}")
-                    with col2:
-                        st.write(f"**Amount:** Rp {inv['amount']:,.0f}")
-                        st.write(f"**Issue Date:** {inv['issue_date']}")
-                        st.markdown(f"**Status:** {status_badge}")
-        else:
-            st.info("No invoices found")
+                        st.rerun()
+                    except Exception as e:
+                        st.error(f"Failed to update: {e}")
+            st.divider()
+    else:
+        st.success("All invoices are paid!")
 
-    # Tab 2: Create Invoice
-    with tab2:
-        st.subheader("Create New Invoice")
-        st.write("Create invoices for completed appointments without invoices")
 
-        # Get completed appointments without invoices + specialization fee
-        eligible_appointments = run_query(
-            """
-            SELECT 
-                a.appointment_id,
-                a.appointment_datetime,
-                a.reason_for_visit,
-                p.first_name  AS patient_first,
-                p.last_name   AS patient_last,
-                d.first_name  AS doctor_first,
-                d.last_name   AS doctor_last,
-                s.specialization_name,
-                s.consultation_fee
-            FROM Appointment a
-            JOIN Patient p        ON a.patient_id = p.patient_id
-            JOIN Schedule sch     ON a.schedule_id = sch.schedule_id
-            JOIN Doctor d         ON sch.doctor_id = d.doctor_id
-            JOIN Specialization s ON d.specialization_id = s.specialization_id
-            LEFT JOIN Invoice i   ON a.appointment_id = i.appointment_id
-            WHERE a.status = 'completed' AND i.appointment_id IS NULL
-            ORDER BY a.appointment_datetime DESC
-            """,
-            fetch=True,
-        )
+INVOICE_VIEWS = {
+    "View All Invoices": render_invoice_list,
+    "Create Invoice": render_invoice_create,
+    "Update Payment": render_invoice_payment,
+}
 
-        if eligible_appointments:
-            st.write(f"**{len(eligible_appointments)} appointment(s) need invoices**")
-            st.divider()
 
-            with st.form("create_invoice_form"):
-                # Build option label → full row mapping
-                appointment_options = {
-                    (
-                        f"#{appt['appointment_id']} - "
-                        f"{appt['patient_first']} {appt['patient_last']} → "
-                        f"Dr. {appt['doctor_first']} {appt['doctor_last']} "
-                        f"({appt['appointment_datetime'].strftime('%Y-%m-%d')}) - "
-                        f"{appt['specialization_name']} "
-                        f"(Rp {appt['consultation_fee']:,.0f})"
-                    ): appt
-                    for appt in eligible_appointments
-                }
-
-                selected_label = st.selectbox(
-                    "Select Appointment", options=list(appointment_options.keys())
-                )
-                selected_appt = appointment_options[selected_label]
+@profiled
+def render_search():
+    """Full-text search over patient names and medical records"""
+    if st.button("← Back to Home"):
+        st.session_state["admin_view"] = "home"
+        st.rerun()
 
-                # Read-only fee information
-                st.info(
-                    f"Consultation fee (from specialization): "
-                    f"Rp {selected_appt['consultation_fee']:,.0f}"
-                )
+    st.header("Search")
 
-                submitted = st.form_submit_button(
-                    "Create Invoice", use_container_width=True, type="primary"
-                )
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        text = st.text_input("Search for", placeholder="e.g. influenza, Simanjuntak")
+    with col2:
+        scope = st.radio("In", ["Patients", "Records"], horizontal=True)
 
-            if submitted:
-                try:
-                    appointment_id = selected_appt["appointment_id"]
-                    amount = selected_appt["consultation_fee"]
-
-                    run_query(
-                        """
-                        INSERT INTO Invoice (appointment_id, amount, issue_date, status)
-                        VALUES (%s, %s, CURDATE(), 'unpaid')
-                        """,
-                        (appointment_id, amount),
-                    )
-                    st.success(
-                        f"Invoice created successfully for Appointment #{appointment_id}!"
-                    )
-                    st.rerun()
-                except Exception as e:
-                    st.error(f"Failed to create invoice: {e}")
+    # Back to the first page whenever the search changes
+    if st.session_state["search_filter"] != (text, scope):
+        st.session_state["search_filter"] = (text, scope)
+        st.session_state["search_page"] = 0
+    page = st.session_state["search_page"]
+
+    if not text:
+        st.info("Type a name, diagnosis, prescription or note to search")
+        return
+
+    if scope == "Patients":
+        results, has_next = search_patients(text, page)
+    else:
+        results, has_next = search_records(text, page=page)
+
+    if results is None:
+        st.error("Search failed")
+        return
+    if not results:
+        st.info("No matches (words shorter than 3 letters are ignored)")
+        return
+
+    st.divider()
+    for row in results:
+        if scope == "Patients":
+            st.write(f"**{row['first_name']} {row['last_name']}** (#{row['patient_id']})")
+            st.caption(f"DOB: {row['dob']} | Phone: {row['phone_number']}")
         else:
-            st.info("No completed appointments need invoices")
+            with st.expander(
+                f"{row['appointment_datetime'].strftime('%Y-%m-%d')} - "
+                f"{row['patient_first']} {row['patient_last']} → "
+                f"Dr. {row['doctor_first']} {row['doctor_last']}: {row['diagnosis'] or 'N/A'}"
+            ):
+                st.write(f"**Diagnosis:** {row['diagnosis'] or 'N/A'}")
+                st.write(f"**Prescription:** {row['prescription'] or 'N/A'}")
+                if row["notes"]:
+                    st.write(f"**Notes:** {row['notes']}")
 
-    # Tab 3: Update Payment Status
-    with tab3:
-        st.subheader("Update Payment Status")
-        st.write("Mark invoices as paid")
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("← Previous", disabled=page == 0):
+            st.session_state["search_page"] -= 1
+            st.rerun()
+    with col2:
+        if st.button("Next →", disabled=not has_next):
+            st.session_state["search_page"] += 1
+            st.rerun()
 
-        # Get unpaid invoices
-        unpaid_invoices = run_query(
-            """
-            SELECT 
-                i.appointment_id,
-                i.amount,
-                i.issue_date,
-                p.first_name as patient_first,
-                p.last_name as patient_last,
-                a.appointment_datetime
-            FROM Invoice i
-            JOIN Appointment a ON i.appointment_id = a.appointment_id
-            JOIN Patient p ON a.patient_id = p.patient_id
-            WHERE i.status = 'unpaid'
-            ORDER BY i.issue_date
-            """,
-            fetch=True,
-        )
 
-        if unpaid_invoices:
-            st.write(f"**{len(unpaid_invoices)} unpaid invoice(s)**")
-            st.divider()
+def parse_invoice_ids(uploaded_file):
+    """Invoice ids from a CSV: the appointment_id/invoice_id column, else the first column"""
+    reader = csv.reader(io.StringIO(uploaded_file.getvalue().decode("utf-8-sig")))
+    rows = [row for row in reader if row]
+    if not rows:
+        return [], []
 
-            for inv in unpaid_invoices:
-                col1, col2 = st.columns([3, 1])
-                with col1:
-                    st.write(f"**Invoice #{inv['appointment_id']}**")
-                    st.write(
-                        f"{inv['patient_first']} {inv['patient_last']} - "
-                        f"Rp {inv['amount']:,.0f}"
-                    )
-                    st.caption(
-                        f"Issued: {inv['issue_date']} | "
-                        f"Appointment: {inv['appointment_datetime'].strftime('%Y-%m-%d')}"
-                    )
-                with col2:
-                    if st.button(
-                        "Mark Paid",
-                        key=f"pay_{inv['appointment_id']}",
-                        use_container_width=True,
-                    ):
-                        try:
-                            run_query(
-                                "UPDATE Invoice SET status = 'paid' WHERE appointment_id = %s",
-                                (inv["appointment_id"],),
-                            )
-                            st.success(
-                                f"Invoice #{inv['appointment_id']} marked as paid!"
-                            )
-                            st.rerun()
-                        except Exception as e:
-                            st.error(f"Failed to update: {e}")
-                st.divider()
+    header = [cell.strip().lower() for cell in rows[0]]
+    column = next(
+        (header.index(name) for name in ("appointment_id", "invoice_id") if name in header),
+        None,
+    )
+    if column is not None:
+        rows = rows[1:]
+    else:
+        column = 0
+
+    ids, invalid = [], []
+    for row in rows:
+        value = row[column].strip().lstrip("#") if column < len(row) else ""
+        if value.isdigit():
+            ids.append(int(value))
         else:
-            st.success("All invoices are paid!")
+            invalid.append(value)
+    return ids, invalid
+
+
+@profiled
+def render_bulk_payment(unpaid_invoices):
+    """Mark many invoices paid at once, from a selection or a bank statement CSV"""
+    options = {
+        f"#{inv['appointment_id']} - {inv['patient_first']} {inv['patient_last']} - "
+        f"Rp {inv['amount']:,.0f}": inv["appointment_id"]
+        for inv in unpaid_invoices
+    }
+
+    with st.form("bulk_payment_form"):
+        selected = st.multiselect("Unpaid invoices", list(options.keys()))
+        uploaded = st.file_uploader(
+            "Or upload a CSV of paid invoice ids "
+            "(column appointment_id / invoice_id, or the first column)",
+            type="csv",
+        )
+        submitted = st.form_submit_button(
+            "Mark Paid", use_container_width=True, type="primary"
+        )
 
+    if not submitted:
+        return
+
+    ids = [options[label] for label in selected]
+    invalid = []
+    if uploaded is not None:
+        csv_ids, invalid = parse_invoice_ids(uploaded)
+        ids += csv_ids
+
+    if invalid:
+        st.warning(f"Ignored {len(invalid)} value(s) that are not invoice ids: {', '.join(invalid[:20])}")
+    if not ids:
+        st.error("Select invoices or upload a CSV first")
+        return
+
+    try:
+        result = mark_invoices_paid(ids)
+    except Exception as e:
+        st.error(f"Failed to update: {e}")
+        return
+
+    st.success(f"{len(result['paid'])} invoice(s) marked as paid")
+    if result["already_paid"]:
+        st.info(
+            f"Already paid: {', '.join(f'#{i}' for i in result['already_paid'])}"
+        )
+    if result["not_found"]:
+        st.warning(f"Not found: {', '.join(f'#{i}' for i in result['not_found'])}")
+
+
+def get_table_columns(table):
+    """Column names of a table in definition order, and its primary key column"""
+    columns = run_query(
+        """
+        SELECT COLUMN_NAME AS name, COLUMN_KEY AS column_key
+        FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+        ORDER BY ORDINAL_POSITION
+        """,
+        (table,),
+        fetch=True,
+    ) or []
+    names = [c["name"] for c in columns]
+    primary_key = next((c["name"] for c in columns if c["column_key"] == "PRI"), None)
+    return names, primary_key
+
+
+def get_approx_row_count(table):
+    """Row count estimate from table statistics (no table scan)"""
+    stats = run_query(
+        """
+        SELECT TABLE_ROWS AS approx_rows
+        FROM information_schema.TABLES
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+        """,
+        (table,),
+        fetch=True,
+    )
+    return stats[0]["approx_rows"] if stats else None
 
+
+@profiled
 def render_database():
-    """View database tables"""
+    """View database tables, one primary-key page at a time"""
     if st.button("← Back to Home"):
         st.session_state["admin_view"] = "home"
         st.rerun()
 
     st.header("Database Tables")
-    st.write("View all data in each table")
+    st.write("Browse the data in each table")
     st.divider()
 
     # List of tables to display
@@ -517,36 +839,198 @@ def render_database():
     ]
 
     # Table selector
-    selected_table = st.selectbox("Select Table", tables)
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        selected_table = st.selectbox("Select Table", tables)
+    with col2:
+        page_size = st.selectbox("Rows per page", [100, 500, 1000])
+
+    columns, primary_key = get_table_columns(selected_table)
+    if not columns:
+        st.info(f"Could not read the columns of {selected_table}")
+        return
+
+    selected_columns = st.multiselect("Columns", columns, default=columns)
+    if not selected_columns:
+        st.info("Select at least one column")
+        return
 
     st.subheader(f"Table: {selected_table}")
+    approx_rows = get_approx_row_count(selected_table)
+    if approx_rows is not None:
+        st.caption(f"About {approx_rows:,} rows (from table statistics)")
+
+    # Start from the first page whenever the table or page size changes.
+    # Each cursor is the primary key of the last row of the previous page.
+    if st.session_state["table_page_filter"] != (selected_table, page_size):
+        st.session_state["table_page_filter"] = (selected_table, page_size)
+        st.session_state["table_page_cursors"] = [None]
+    cursors = st.session_state["table_page_cursors"]
+
+    # Names come from information_schema, never from user input; the
+    # primary key is always read so the next page can seek past it
+    query_columns = list(dict.fromkeys([primary_key, *selected_columns]))
+    select_list = ", ".join(f"`{c}`" for c in query_columns)
+    where_clause = f"WHERE `{primary_key}` > %s" if cursors[-1] is not None else ""
+    params = (cursors[-1],) if cursors[-1] is not None else ()
+
+    rows = run_query(
+        f"""
+        SELECT {select_list}
+        FROM `{selected_table}`
+        {where_clause}
+        ORDER BY `{primary_key}`
+        LIMIT %s
+        """,
+        params + (page_size + 1,),
+        fetch=True,
+    )
+
+    has_next = bool(rows) and len(rows) > page_size
+    rows = (rows or [])[:page_size]
+
+    if rows:
+        first_row = (len(cursors) - 1) * page_size + 1
+        st.write(f"**Rows {first_row}–{first_row + len(rows) - 1}**")
 
-    # Query and display the selected table
-    data = run_query(f"SELECT * FROM {selected_table}", fetch=True)
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("← Previous", disabled=len(cursors) == 1):
+                cursors.pop()
+                st.rerun()
+        with col2:
+            if st.button("Next →", disabled=not has_next):
+                cursors.append(rows[-1][primary_key])
+                st.rerun()
 
-    if data:
-        st.write(f"**Total rows: {len(data)}**")
-        st.dataframe(data, use_container_width=True)
+        st.dataframe(
+            [{c: row[c] for c in selected_columns} for row in rows],
+            use_container_width=True,
+        )
     else:
         st.info(f"No data in {selected_table}")
 
 
+@profiled
+def render_export():
+    """Export appointments or invoices for a date range as CSV or Parquet"""
+    if st.button("← Back to Home"):
+        st.session_state["admin_view"] = "home"
+        st.rerun()
+
+    st.header("Export Data")
+    st.write(
+        "Rows are streamed from the database into the file in chunks. "
+        "For very large exports use `python -m scripts.export` on the server."
+    )
+
+    with st.form("export_form"):
+        col1, col2 = st.columns(2)
+        with col1:
+            name = st.selectbox("Data", list(EXPORTS), format_func=str.title)
+            fmt = st.radio("Format", FORMATS, horizontal=True, format_func=str.upper)
+        with col2:
+            start_date = st.date_input("From", date.today().replace(day=1))
+            end_date = st.date_input("To", date.today())
+        submitted = st.form_submit_button("Export", use_container_width=True, type="primary")
+
+    if not submitted:
+        return
+    if start_date > end_date:
+        st.error("'From' must not be after 'To'")
+        return
+
+    filename = f"{name}_{start_date}_{end_date}.{fmt}"
+    # A unique file per export: sessions share this process and its temp dir
+    fd, path = tempfile.mkstemp(prefix="clinic_export_", suffix=f".{fmt}")
+    os.close(fd)
+    try:
+        result = export(name, fmt, path, start_date, end_date)
+        if not result["rows"]:
+            st.info("No rows in this date range")
+            return
+        # The download itself is held in memory by Streamlit until served
+        with open(path, "rb") as f:
+            st.download_button(f"Download {filename}", f, file_name=filename, use_container_width=True)
+        st.success(f"Exported {result['rows']} row(s) in {result['seconds']:.1f}s")
+    except Exception as e:
+        st.error(f"Export failed: {e}")
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+@profiled
+def render_import():
+    """Bulk-register patients from an uploaded CSV"""
+    if st.button("← Back to Home"):
+        st.session_state["admin_view"] = "home"
+        st.rerun()
+
+    st.header("Import Patients")
+    st.write(f"CSV with a header row: {', '.join(COLUMNS)} (email and address optional)")
+
+    with st.form("import_form"):
+        uploaded = st.file_uploader("Patients CSV", type="csv")
+        dry_run = st.checkbox("Dry run (validate and check duplicates only)")
+        submitted = st.form_submit_button("Import", use_container_width=True, type="primary")
+
+    if not submitted:
+        return
+    if uploaded is None:
+        st.error("Upload a CSV first")
+        return
+
+    rows, errors, repeated = parse_patients(
+        io.StringIO(uploaded.getvalue().decode("utf-8-sig"), newline="")
+    )
+    try:
+        result = import_patients(rows, dry_run=dry_run)
+    except ImportInterrupted as e:
+        st.error(f"Import stopped, {e}. Upload the file again to insert the rest.")
+        return
+    except Exception as e:
+        st.error(f"Import failed, nothing was inserted: {e}")
+        return
+
+    verb = "would be imported" if dry_run else "imported"
+    st.success(
+        f"{result['inserted']} patient(s) {verb} in {result['seconds']:.2f}s "
+        f"({result['rows_per_sec']:,.0f} rows/s)"
+    )
+    if result["existing"] or repeated:
+        st.info(f"Skipped {result['existing']} existing patient(s) and {repeated} repeated row(s)")
+    if errors:
+        st.warning(f"{len(errors)} invalid row(s) skipped")
+        st.dataframe(
+            [{"line": line, "problem": message} for line, message in errors],
+            use_container_width=True,
+        )
+
+
 def main():
-    init_state()
-
-    match st.session_state["admin_view"]:
-        case "dashboard":
-            render_dashboard()
-        case "schedules":
-            render_schedules()
-        case "appointments":
-            render_appointments()
-        case "invoices":
-            render_invoices()
-        case "database":
-            render_database()
-        case _:
-            render_home_view()
+    with profile_rerun("admin"):
+        init_state()
+
+        match st.session_state["admin_view"]:
+            case "dashboard":
+                render_dashboard()
+            case "schedules":
+                render_schedules()
+            case "appointments":
+                render_appointments()
+            case "invoices":
+                render_invoices()
+            case "database":
+                render_database()
+            case "search":
+                render_search()
+            case "export":
+                render_export()
+            case "import":
+                render_import()
+            case _:
+                render_home_view()
 
 
 if __name__ == "__main__":
@@ -1,9 +1,18 @@
 import streamlit as st
-from db_utils import run_query
+from db_utils import run_queries_parallel, run_query, transaction
+from profiler import profile_rerun, profiled
+from services.search import search_records
+from services.visits import (
+    cancel_prefetch,
+    load_patient_context,
+    prefetch_next_context,
+    take_prefetched_context,
+)
 from datetime import date, timedelta
 
 
 
+@profiled(kind="state")
 def init_state():
     """Initialize doctor session state"""
     defaults = {
@@ -12,14 +21,19 @@ def init_state():
         "logged_in_doctor_name": None,
         "selected_appointment_id": None,
         "selected_patient_id": None,
+        "search_filter": None,
+        "search_page": 0,
+        "patient_context": None,
     }
     for key, value in defaults.items():
         if key not in st.session_state:
             st.session_state[key] = value
 
 
+@profiled(kind="state")
 def logout():
     """Clear doctor session"""
+    cancel_prefetch(st.session_state["logged_in_doctor_id"])
     st.session_state.update(
         {
             "logged_in_doctor_id": None,
@@ -27,10 +41,14 @@ def logout():
             "doctor_view": "home",
             "selected_appointment_id": None,
             "selected_patient_id": None,
+            "search_filter": None,
+            "search_page": 0,
+            "patient_context": None,
         }
     )
 
 
+@profiled
 def render_home_view():
     """Doctor login page"""
     st.header("Doctor Portal")
@@ -40,6 +58,7 @@ def render_home_view():
         "SELECT d.doctor_id, d.first_name, d.last_name, s.specialization_name "
         "FROM Doctor d JOIN Specialization s ON d.specialization_id = s.specialization_id",
         fetch=True,
+        cache_ttl=300,
     )
 
     for doc in doctors:
@@ -62,46 +81,96 @@ def render_home_view():
         st.divider()
 
 
+DASHBOARD_WINDOWS = {"Today": 1, "This week": None, "Next 7 days": 7}
+
+
+def dashboard_window(choice):
+    """[start, end) dates of a dashboard window; "This week" runs from today to Sunday"""
+    today = date.today()
+    days = DASHBOARD_WINDOWS[choice]
+    if days is None:
+        days = 7 - today.weekday()
+    return today, today + timedelta(days=days)
+
+
+@profiled
 def render_dashboard():
     """Doctor dashboard - Upcoming appointments list"""
     st.header(f"Welcome, {st.session_state['logged_in_doctor_name']}!")
 
-    if st.button("Logout", type="primary"):
-        logout()
-        st.rerun()
+    col1, col2 = st.columns([1, 4])
+    with col1:
+        if st.button("Logout", type="primary"):
+            logout()
+            st.rerun()
+    with col2:
+        if st.button("Search My Records"):
+            st.session_state["doctor_view"] = "search"
+            st.rerun()
 
     st.divider()
     st.subheader("Upcoming Appointments")
 
-    # Get all upcoming scheduled appointments
-    appointments = run_query(
-        """
-        SELECT 
-            a.appointment_id,
-            a.reason_for_visit,
-            a.appointment_datetime,
-            sch.start_time,
-            sch.end_time,
-            p.patient_id,
-            p.first_name AS patient_first_name,
-            p.last_name AS patient_last_name,
-            p.gender,
-            p.dob
-        FROM Appointment a
-        JOIN Schedule sch ON a.schedule_id = sch.schedule_id
-        JOIN Patient p ON a.patient_id = p.patient_id
-        WHERE sch.doctor_id = %s 
-          AND a.status = 'scheduled'
-    """,
-        (st.session_state["logged_in_doctor_id"],),
-        fetch=True,
+    window = st.radio(
+        "Show", list(DASHBOARD_WINDOWS), horizontal=True, key="dashboard_window"
+    )
+    start, end = dashboard_window(window)
+    params = (st.session_state["logged_in_doctor_id"], start, end)
+
+    # Per-day counts for the header are computed by the server, alongside the list.
+    # Both queries are served by the (schedule_id, status, appointment_datetime) index.
+    day_counts, appointments = run_queries_parallel(
+        [
+            (
+                """
+                SELECT DATE(a.appointment_datetime) AS day, COUNT(*) AS count
+                FROM Schedule sch
+                JOIN Appointment a ON a.schedule_id = sch.schedule_id
+                WHERE sch.doctor_id = %s
+                  AND a.status = 'scheduled'
+                  AND a.appointment_datetime >= %s
+                  AND a.appointment_datetime < %s
+                GROUP BY DATE(a.appointment_datetime)
+                ORDER BY day
+                """,
+                params,
+            ),
+            (
+                """
+                SELECT 
+                    a.appointment_id,
+                    a.reason_for_visit,
+                    a.appointment_datetime,
+                    sch.start_time,
+                    sch.end_time,
+                    p.patient_id,
+                    p.first_name AS patient_first_name,
+                    p.last_name AS patient_last_name,
+                    p.gender,
+                    p.dob
+                FROM Schedule sch
+                JOIN Appointment a ON a.schedule_id = sch.schedule_id
+                JOIN Patient p ON a.patient_id = p.patient_id
+                WHERE sch.doctor_id = %s 
+                  AND a.status = 'scheduled'
+                  AND a.appointment_datetime >= %s
+                  AND a.appointment_datetime < %s
+                ORDER BY a.appointment_datetime
+                """,
+                params,
+            ),
+        ]
     )
 
     if not appointments:
-        st.info("No upcoming appointments")
+        st.info(f"No appointments {window.lower()}")
         return
 
     st.write(f"**{len(appointments)} upcoming appointment(s)**")
+    if day_counts and len(day_counts) > 1:
+        cols = st.columns(len(day_counts))
+        for col, day in zip(cols, day_counts):
+            col.metric(day["day"].strftime("%a, %b %d"), day["count"])
     st.divider()
 
     for appt in appointments:
@@ -133,26 +202,42 @@ def render_dashboard():
 \
 
 
+def get_patient_context():
+    """Patient context for the selected appointment, loaded once per visit"""
+    appointment_id = st.session_state["selected_appointment_id"]
+    context = st.session_state["patient_context"]
+    if context is None or context["appointment_id"] != appointment_id:
+        context = take_prefetched_context(
+            st.session_state["logged_in_doctor_id"], appointment_id
+        ) or load_patient_context(appointment_id)
+        st.session_state["patient_context"] = context
+    return context
+
+
+def close_visit():
+    """Leave the visit screens and drop the cached patient context"""
+    st.session_state.update(
+        {
+            "doctor_view": "dashboard",
+            "selected_appointment_id": None,
+            "selected_patient_id": None,
+            "patient_context": None,
+        }
+    )
+
+
+@profiled
 def render_patient_context():
     """Review patient context - basic info + previous visits"""
     if st.button("← Back to Dashboard"):
-        st.session_state["doctor_view"] = "dashboard"
-        st.session_state["selected_appointment_id"] = None
-        st.session_state["selected_patient_id"] = None
+        close_visit()
         st.rerun()
 
-    patient_id = st.session_state["selected_patient_id"]
-
-    # Get patient basic info
-    patient = run_query(
-        """
-        SELECT first_name, last_name, dob, gender, phone_number, email, address
-        FROM Patient
-        WHERE patient_id = %s
-    """,
-        (patient_id,),
-        fetch=True,
-    )[0]
+    context = get_patient_context()
+    if context is None:
+        st.error("Could not load this appointment")
+        return
+    patient = context["patient"]
 
     # Calculate age
     today = date.today()
@@ -178,25 +263,7 @@ def render_patient_context():
     # Previous visits
     st.markdown("### Previous Visits")
 
-    previous_visits = run_query(
-        """
-        SELECT 
-            a.appointment_datetime,
-            a.reason_for_visit,
-            r.diagnosis,
-            r.prescription,
-            r.notes
-        FROM Appointment a
-        LEFT JOIN Record r ON a.appointment_id = r.appointment_id
-        WHERE a.patient_id = %s 
-          AND a.status = 'completed'
-          AND a.appointment_id != %s
-        ORDER BY a.appointment_datetime DESC
-        LIMIT 5
-    """,
-        (patient_id, st.session_state["selected_appointment_id"]),
-        fetch=True,
-    )
+    previous_visits = context["history"]
 
     if previous_visits:
         for visit in previous_visits:
@@ -218,6 +285,57 @@ def render_patient_context():
         st.rerun()
 
 
+@profiled
+def render_search():
+    """Full-text search over the medical records of this doctor's visits"""
+    if st.button("← Back to Dashboard"):
+        st.session_state["doctor_view"] = "dashboard"
+        st.rerun()
+
+    st.subheader("Search My Records")
+    text = st.text_input("Diagnosis, prescription or notes", placeholder="e.g. influenza")
+
+    # Back to the first page whenever the search changes
+    if st.session_state["search_filter"] != text:
+        st.session_state["search_filter"] = text
+        st.session_state["search_page"] = 0
+    page = st.session_state["search_page"]
+
+    if not text:
+        return
+
+    records, has_next = search_records(
+        text, doctor_id=st.session_state["logged_in_doctor_id"], page=page
+    )
+    if records is None:
+        st.error("Search failed")
+        return
+    if not records:
+        st.info("No matches (words shorter than 3 letters are ignored)")
+        return
+
+    for record in records:
+        with st.expander(
+            f"{record['appointment_datetime'].strftime('%Y-%m-%d')} - "
+            f"{record['patient_first']} {record['patient_last']}: {record['diagnosis'] or 'N/A'}"
+        ):
+            st.write(f"**Diagnosis:** {record['diagnosis'] or 'N/A'}")
+            st.write(f"**Prescription:** {record['prescription'] or 'N/A'}")
+            if record["notes"]:
+                st.write(f"**Notes:** {record['notes']}")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("← Previous", disabled=page == 0):
+            st.session_state["search_page"] -= 1
+            st.rerun()
+    with col2:
+        if st.button("Next →", disabled=not has_next):
+            st.session_state["search_page"] += 1
+            st.rerun()
+
+
+@profiled
 def render_conduct_appointment():
     """Conduct appointment and input diagnosis/prescription"""
     if st.button("← Back to Patient Info"):
@@ -226,24 +344,18 @@ def render_conduct_appointment():
 
     appointment_id = st.session_state["selected_appointment_id"]
 
-    # Get current appointment details
-    appt = run_query(
-        """
-        SELECT 
-            p.first_name,
-            p.last_name,
-            a.reason_for_visit
-        FROM Appointment a
-        JOIN Patient p ON a.patient_id = p.patient_id
-        WHERE a.appointment_id = %s
-    """,
-        (appointment_id,),
-        fetch=True,
-    )[0]
+    context = get_patient_context()
+    if context is None:
+        st.error("Could not load this appointment")
+        return
+    patient = context["patient"]
 
-    st.subheader(f"Appointment: {appt['first_name']} {appt['last_name']}")
+    # Warm the next patient's context while this visit is in progress
+    prefetch_next_context(st.session_state["logged_in_doctor_id"], context)
+
+    st.subheader(f"Appointment: {patient['first_name']} {patient['last_name']}")
     st.write(
-        f"**Reason for visit:** {appt['reason_for_visit'] or 'General consultation'}"
+        f"**Reason for visit:** {context['reason_for_visit'] or 'General consultation'}"
     )
 
     st.divider()
@@ -271,25 +383,24 @@ def render_conduct_appointment():
             st.error("Diagnosis is required")
         else:
             try:
-                # Update appointment status
-                run_query(
-                    "UPDATE Appointment SET status = 'completed' WHERE appointment_id = %s",
-                    (appointment_id,),
-                )
-
-                # Add medical record
-                run_query(
-                    "INSERT INTO Record (appointment_id, diagnosis, prescription, notes) VALUES (%s, %s, %s, %s)",
-                    (appointment_id, diagnosis, prescription or None, notes or None),
-                )
+                with transaction() as tx:
+                    # Update appointment status
+                    tx.execute(
+                        "UPDATE Appointment SET status = 'completed' WHERE appointment_id = %s",
+                        (appointment_id,),
+                    )
+
+                    # Add medical record
+                    tx.execute(
+                        "INSERT INTO Record (appointment_id, diagnosis, prescription, notes) VALUES (%s, %s, %s, %s)",
+                        (appointment_id, diagnosis, prescription or None, notes or None),
+                    )
 
                 st.success("Appointment completed successfully!")
                 st.balloons()
 
                 # Reset and return to dashboard
-                st.session_state["selected_appointment_id"] = None
-                st.session_state["selected_patient_id"] = None
-                st.session_state["doctor_view"] = "dashboard"
+                close_visit()
 
                 st.info("Returning to dashboard...")
                 st.rerun()
@@ -299,20 +410,23 @@ def render_conduct_appointment():
 
 
 def main():
-    init_state()
-
-    if st.session_state["logged_in_doctor_id"]:
-        match st.session_state["doctor_view"]:
-            case "dashboard":
-                render_dashboard()
-            case "patient_context":
-                render_patient_context()
-            case "conduct_appointment":
-                render_conduct_appointment()
-            case _:
-                render_dashboard()
-    else:
-        render_home_view()
+    with profile_rerun("doctor"):
+        init_state()
+
+        if st.session_state["logged_in_doctor_id"]:
+            match st.session_state["doctor_view"]:
+                case "dashboard":
+                    render_dashboard()
+                case "patient_context":
+                    render_patient_context()
+                case "conduct_appointment":
+                    render_conduct_appointment()
+                case "search":
+                    render_search()
+                case _:
+                    render_dashboard()
+        else:
+            render_home_view()
 
 
 if __name__ == "__main__":
@@ -1,10 +1,15 @@
 import streamlit as st
 from datetime import datetime, timedelta, date
-from db_utils import run_query
+from db_utils import run_query, transaction
+from profiler import profile_rerun, profiled
+from services.booking import SlotUnavailable, book_slot, release_slot
+from services.patients import LOOKUP_LIMIT, find_patients
+from services.slots import HORIZON_DAYS, available_slots
 from collections import defaultdict
 
 
 # Session state helpers
+@profiled(kind="state")
 def init_state():
     """Initialize all session state variables"""
     defaults = {
@@ -19,6 +24,7 @@ def init_state():
             st.session_state[key] = value
 
 
+@profiled(kind="state")
 def logout():
     """Clear patient session"""
     st.session_state.update(
@@ -38,25 +44,8 @@ def nav_button(label, view):
         st.session_state["patient_view"] = view
         st.rerun()
 
-def get_next_weekday(target_day_name):
-    """Calculate next occurrence of a weekday"""
-    days = {
-        'Monday': 0, 'Tuesday': 1, 'Wednesday': 2, 'Thursday': 3,
-        'Friday': 4, 'Saturday': 5, 'Sunday': 6
-    }
-    
-    today = date.today()
-    today_weekday = today.weekday()
-    target_weekday = days[target_day_name]
-    
-    days_ahead = target_weekday - today_weekday
-    if days_ahead <= 0:  # Target day already passed this week
-        days_ahead += 7
-    
-    return today + timedelta(days=days_ahead)
-
-
 # Public views
+@profiled
 def render_home_view():
     st.header("Welcome to the Clinic!")
     col1, col2 = st.columns(2)
@@ -66,6 +55,7 @@ def render_home_view():
         nav_button("Login as a Patient", "login")
 
 
+@profiled
 def render_registration_form():
     if st.button("← Back"):
         st.session_state["patient_view"] = "home"
@@ -113,6 +103,7 @@ def render_registration_form():
                     st.error(f"Registration failed: {e}")
 
 
+@profiled
 def render_login_view():
     if st.button("← Back"):
         st.session_state["patient_view"] = "home"
@@ -126,18 +117,29 @@ def render_login_view():
         max_value=datetime(2025, 12, 31),
     )
 
+    col1, col2 = st.columns(2)
+    with col1:
+        phone = st.text_input("Phone Number")
+    with col2:
+        name = st.text_input("Name (first letters)")
+
     if st.button("Search", use_container_width=True):
-        patients = run_query(
-            "SELECT patient_id, first_name, last_name, phone_number, email FROM Patient WHERE dob = %s",
-            (dob,),
-            fetch=True,
-        )
+        if not phone and not name:
+            st.error("Enter your phone number or the start of your name")
+            return
+        patients = find_patients(dob, phone=phone, name_prefix=name)
         st.session_state["search_results"] = patients
         st.session_state["search_performed"] = True
         st.rerun()
 
     if st.session_state["search_performed"]:
         patients = st.session_state["search_results"]
+        if patients and len(patients) > LOOKUP_LIMIT:
+            patients = patients[:LOOKUP_LIMIT]
+            st.warning(
+                f"More than {LOOKUP_LIMIT} patients match; showing the first "
+                f"{LOOKUP_LIMIT}. Add your phone number or more of your name."
+            )
         if patients:
             st.success(f"Found {len(patients)} patient(s)")
             for p in patients:
@@ -167,6 +169,7 @@ def render_login_view():
 
 
 # Dashboard views
+@profiled
 def render_patient_dashboard():
     st.header(f"Welcome, {st.session_state['logged_in_patient_name']}!")
 
@@ -211,12 +214,13 @@ def get_appointments(patient_id, status_filter=None):
     return run_query(query, tuple(params), fetch=True)
 
 
+@profiled
 def render_appointment_item(appt, show_cancel=False):
     """Reusable appointment display"""
     col1, col2 = st.columns([3, 1])
     with col1:
         st.write(
-            f"**{appt['available_day']} at {appt['start_time']}–{appt['end_time']}**"
+            f"**{appt['appointment_datetime'].strftime('%a, %b %d')} at {appt['start_time']}–{appt['end_time']}**"
         )
         st.caption(f"Dr. {appt['doctor_first_name']} {appt['doctor_last_name']}")
         st.caption(f"Reason: {appt.get('reason_for_visit') or 'Not specified'}")
@@ -230,14 +234,12 @@ def render_appointment_item(appt, show_cancel=False):
                 use_container_width=True,
             ):
                 try:
-                    run_query(
-                        "UPDATE Appointment SET status = 'cancelled' WHERE appointment_id = %s",
-                        (appt["appointment_id"],),
-                    )
-                    run_query(
-                        "UPDATE Schedule SET is_booked = FALSE WHERE schedule_id = %s",
-                        (appt["schedule_id"],),
-                    )
+                    with transaction() as tx:
+                        tx.execute(
+                            "UPDATE Appointment SET status = 'cancelled' WHERE appointment_id = %s",
+                            (appt["appointment_id"],),
+                        )
+                        release_slot(tx, appt["appointment_id"])
                     st.success("Cancelled")
                     st.rerun()
                 except Exception as e:
@@ -252,6 +254,7 @@ def render_appointment_item(appt, show_cancel=False):
     st.divider()
 
 
+@profiled
 def render_view_appointments():
     back_to_dash()
     st.subheader("My Appointments")
@@ -283,6 +286,7 @@ def render_view_appointments():
                     render_appointment_item(appt)
 
 
+@profiled
 def render_cancel_view():
     back_to_dash()
     st.subheader("Cancel an Appointment")
@@ -298,11 +302,12 @@ def render_cancel_view():
             render_appointment_item(appt, show_cancel=True)
 
 
+@profiled
 def render_booking_view():
     back_to_dash()
     st.subheader("Book an Appointment")
 
-    specs = run_query("SELECT * FROM Specialization", fetch=True)
+    specs = run_query("SELECT * FROM Specialization", fetch=True, cache_ttl=300)
     if not specs:
         st.error("No specializations available")
         return
@@ -318,6 +323,7 @@ def render_booking_view():
         "SELECT doctor_id, first_name, last_name FROM Doctor WHERE specialization_id = %s",
         (spec_id,),
         fetch=True,
+        cache_ttl=300,
     )
     if not doctors:
         st.warning("No doctors available")
@@ -332,52 +338,49 @@ def render_booking_view():
         if f"Dr. {d['first_name']} {d['last_name']}" == doctor_choice
     )
 
-    slots = run_query(
-        "SELECT * FROM Schedule WHERE doctor_id = %s AND is_booked = FALSE",
-        (doctor_id,),
-        fetch=True,
+    today = date.today()
+    last_day = today + timedelta(days=HORIZON_DAYS - 1)
+    dates = st.date_input(
+        "Dates",
+        (today, min(today + timedelta(days=6), last_day)),
+        min_value=today,
+        max_value=last_day,
     )
+    # The range picker returns a single date until the end date is chosen
+    start_date, end_date = (dates[0], dates[-1]) if dates else (today, today)
+
+    slots = available_slots(doctor_id, start_date, end_date)
     if not slots:
-        st.info("No slots available")
+        st.info("No slots available on these dates")
         return
 
-    slot_choice = st.selectbox(
-        "Time Slot",
-        [f"{s['available_day']} {s['start_time']}–{s['end_time']}" for s in slots],
-    )
-    slot = next(
-        s
-        for s in slots
-        if f"{s['available_day']} {s['start_time']}–{s['end_time']}" == slot_choice
-    )
+    def slot_label(s):
+        return f"{s['slot_date'].strftime('%a, %b %d')} {s['start_time']}–{s['end_time']}"
+
+    slot_choice = st.selectbox("Time Slot", [slot_label(s) for s in slots])
+    slot = next(s for s in slots if slot_label(s) == slot_choice)
 
     reason = st.text_input("Reason for visit")
 
     if st.button("Confirm", use_container_width=True):
         try:
-            # ✅ FIXED: Calculate next occurrence of the selected weekday
-            next_date = get_next_weekday(slot['available_day'])
-            appointment_datetime = f"{next_date} {slot['start_time']}"
-            
-            run_query(
-                "INSERT INTO Appointment (patient_id, schedule_id, reason_for_visit, appointment_datetime, status) VALUES (%s, %s, %s, %s, 'scheduled')",
-                (
-                    st.session_state["logged_in_patient_id"],
-                    slot["schedule_id"],
-                    reason,
-                    appointment_datetime,  # ✅ Now uses calculated date
-                ),
-            )
-            run_query(
-                "UPDATE Schedule SET is_booked = TRUE WHERE schedule_id = %s",
-                (slot["schedule_id"],),
+            book_slot(
+                st.session_state["logged_in_patient_id"],
+                slot["slot_id"],
+                reason,
             )
-            st.success(f"Appointment booked for {next_date.strftime('%A, %B %d, %Y')}!")
+            st.success(f"Appointment booked for {slot['slot_date'].strftime('%A, %B %d, %Y')}!")
             st.balloons()
+        except SlotUnavailable:
+            st.warning(
+                "Sorry, this slot was just booked by someone else or has already started. "
+                "Please pick another."
+            )
         except Exception as e:
             st.error(f"Booking failed: {e}")
 
 
+@profiled
 def render_update_profile():
     back_to_dash()
     st.subheader("Update My Profile")
@@ -419,32 +422,33 @@ def render_update_profile():
 
 # Main router
 def main():
-    init_state()
-
-    if st.session_state["logged_in_patient_id"]:
-        match st.session_state["patient_view"]:
-            case "dashboard":
-                render_patient_dashboard()
-            case "book":
-                render_booking_view()
-            case "view":
-                render_view_appointments()
-            case "cancel":
-                render_cancel_view()
-            case "update_profile":
-                render_update_profile()
-            case _:
-                render_patient_dashboard()
-    else:
-        match st.session_state["patient_view"]:
-            case "home":
-                render_home_view()
-            case "register":
-                render_registration_form()
-            case "login":
-                render_login_view()
-            case _:
-                render_home_view()
+    with profile_rerun("patient"):
+        init_state()
+
+        if st.session_state["logged_in_patient_id"]:
+            match st.session_state["patient_view"]:
+                case "dashboard":
+                    render_patient_dashboard()
+                case "book":
+                    render_booking_view()
+                case "view":
+                    render_view_appointments()
+                case "cancel":
+                    render_cancel_view()
+                case "update_profile":
+                    render_update_profile()
+                case _:
+                    render_patient_dashboard()
+        else:
+            match st.session_state["patient_view"]:
+                case "home":
+                    render_home_view()
+                case "register":
+                    render_registration_form()
+                case "login":
+                    render_login_view()
+                case _:
+                    render_home_view()
 
 
 if __name__ == "__main__":
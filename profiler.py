@@ -0,0 +1,190 @@
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from functools import wraps
+
+import streamlit as st
+
+from db_utils import query_stats
+
+# Opt in with PROFILE_PAGES=1, or per browser tab with ?profile=1 in the URL
+PROFILE_PAGES = os.getenv("PROFILE_PAGES", "") not in ("", "0")
+PROFILE_DIR = os.getenv("PROFILE_DIR", ".profiles")
+
+# Context variables rather than thread-locals: Streamlit runs each
+# session's script in its own thread, and db_utils.run_query_async copies
+# the context into its worker threads, so fanned-out queries still reach
+# the span that submitted them.
+_profile = ContextVar("profile", default=None)
+_span = ContextVar("profile_span", default=None)
+# Several query workers may charge the same span at once
+_span_lock = threading.Lock()
+
+
+def _active():
+    return _profile.get()
+
+
+def _on_query(timer, seconds):
+    """Charge a finished statement to the innermost span running when it was issued.
+
+    Queries fanned out by run_queries_parallel overlap, so the span's
+    db_ms is the time at least one of its queries was running, not the sum.
+    """
+    span = _span.get()
+    if span is None:
+        return
+    end = time.perf_counter()
+    with _span_lock:
+        busy = []
+        for start, stop in sorted(span["_busy"] + [(end - seconds, end)]):
+            if busy and start <= busy[-1][1]:
+                busy[-1] = (busy[-1][0], max(busy[-1][1], stop))
+            else:
+                busy.append((start, stop))
+        span["_busy"] = busy
+        span["db_ms"] = sum(stop - start for start, stop in busy) * 1000
+        span["queries"] += 1
+
+
+query_stats.listeners.append(_on_query)
+
+
+def profiled(fn=None, *, kind="render"):
+    """Time a page function when profiling is on.
+
+    kind is "render" for view functions and "state" for session-state
+    helpers; query time inside the function is split out automatically.
+    """
+    if fn is None:
+        return lambda f: profiled(f, kind=kind)
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        profile = _active()
+        if profile is None:
+            return fn(*args, **kwargs)
+
+        span = {
+            "name": fn.__name__,
+            "kind": kind,
+            "depth": len(profile["stack"]),
+            "total_ms": 0.0,
+            "db_ms": 0.0,
+            "queries": 0,
+            "children_ms": 0.0,
+            "_busy": [],
+        }
+        profile["spans"].append(span)
+        profile["stack"].append(span)
+        token = _span.set(span)
+        started = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            span["total_ms"] = (time.perf_counter() - started) * 1000
+            _span.reset(token)
+            profile["stack"].pop()
+            if profile["stack"]:
+                profile["stack"][-1]["children_ms"] += span["total_ms"]
+
+    return wrapper
+
+
+def _enabled():
+    return PROFILE_PAGES or st.query_params.get("profile") == "1"
+
+
+def _session_id():
+    if "profile_session_id" not in st.session_state:
+        st.session_state["profile_session_id"] = uuid.uuid4().hex[:12]
+    return st.session_state["profile_session_id"]
+
+
+def _summarize(profile, total_ms):
+    """Split the rerun's wall time into queries, session-state work and rendering."""
+    db_ms = sum(s["db_ms"] for s in profile["spans"])
+    state_ms = sum(
+        s["total_ms"] - s["children_ms"] - s["db_ms"]
+        for s in profile["spans"]
+        if s["kind"] == "state"
+    )
+    return {
+        "timestamp": datetime.now().isoformat(timespec="milliseconds"),
+        "page": profile["page"],
+        "total_ms": round(total_ms, 2),
+        "db_ms": round(db_ms, 2),
+        "queries": sum(s["queries"] for s in profile["spans"]),
+        "state_ms": round(state_ms, 2),
+        "render_ms": round(total_ms - db_ms - state_ms, 2),
+        "spans": [
+            {
+                **{key: value for key, value in s.items() if key != "_busy"},
+                "self_ms": round(s["total_ms"] - s["children_ms"] - s["db_ms"], 2),
+            }
+            for s in profile["spans"]
+        ],
+    }
+
+
+def _write_trace(summary):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    path = os.path.join(PROFILE_DIR, f"{_session_id()}.jsonl")
+    with open(path, "a") as f:
+        f.write(json.dumps(summary) + "\n")
+    return path
+
+
+def _render_panel(summary, path):
+    with st.expander(
+        f"Render profile: {summary['total_ms']:.0f} ms "
+        f"({summary['queries']} queries)"
+    ):
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Total", f"{summary['total_ms']:.1f} ms")
+        col2.metric("Queries", f"{summary['db_ms']:.1f} ms")
+        col3.metric("Rendering", f"{summary['render_ms']:.1f} ms")
+        col4.metric("Session state", f"{summary['state_ms']:.1f} ms")
+        st.dataframe(
+            [
+                {
+                    "function": "  " * s["depth"] + s["name"],
+                    "kind": s["kind"],
+                    "total ms": round(s["total_ms"], 2),
+                    "query ms": round(s["db_ms"], 2),
+                    "queries": s["queries"],
+                    "self ms": s["self_ms"],
+                }
+                for s in summary["spans"]
+            ],
+            use_container_width=True,
+        )
+        st.caption(f"Trace: {path}")
+
+
+@contextmanager
+def profile_rerun(page):
+    """Profile one rerun of a page's main(): show a breakdown panel and append it to the session trace."""
+    if not _enabled():
+        yield
+        return
+
+    profile = {"page": page, "spans": [], "stack": []}
+    token = _profile.set(profile)
+    started = time.perf_counter()
+    finished = False
+    try:
+        yield
+        finished = True
+    finally:
+        _profile.reset(token)
+        summary = _summarize(profile, (time.perf_counter() - started) * 1000)
+        path = _write_trace(summary)
+        # st.rerun()/st.stop() end the script early; only the trace is kept
+        if finished:
+            _render_panel(summary, path)
@@ -0,0 +1,165 @@
+"""Benchmark every query catalogued in database/*.sql against the configured database.
+
+Usage (from the repo root, after loading a dataset with scripts.generate_data):
+    python -m scripts.benchmark --scale 1m --runs 50 --output bench/1m.json
+    python -m scripts.benchmark --scale 1m --compare bench/1m.json
+
+Each query is bound to sample parameters and run --runs times on one pooled
+connection. Every run is rolled back, so UPDATE/DELETE entries leave the
+dataset untouched; INSERT ... VALUES entries are skipped. The report
+lists p50/p95/p99 latency, rows returned, rows examined (from the session
+Handler_read_* counters) and an EXPLAIN summary. --output saves it as a JSON
+baseline; --compare exits non-zero if any query's p95 regressed by more than
+--threshold against a saved baseline.
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from db_utils import get_pool
+from scripts.catalog import bind_params, load_catalog
+
+BENCHMARKED = {"SELECT", "UPDATE", "DELETE"}
+
+
+def latency_summary(timings_ms):
+    """p50/p95/p99/mean of a list of latencies in milliseconds (at least two)."""
+    cuts = statistics.quantiles(timings_ms, n=100, method="inclusive")
+    return {
+        "p50_ms": round(cuts[49], 3),
+        "p95_ms": round(cuts[94], 3),
+        "p99_ms": round(cuts[98], 3),
+        "mean_ms": round(statistics.fmean(timings_ms), 3),
+    }
+
+
+def handler_reads(cursor):
+    """Rows the storage engine handed to this session so far."""
+    cursor.execute("SHOW SESSION STATUS LIKE 'Handler_read%'")
+    return sum(int(row["Value"]) for row in cursor.fetchall())
+
+
+def plan_summary(cursor, query, params):
+    cursor.execute(f"EXPLAIN {query.sql}", params)
+    steps = cursor.fetchall()
+    return " > ".join(f"{s['table']}:{s['type']}({s['key'] or '-'})" for s in steps)
+
+
+def benchmark_query(conn, query, params, runs, warmup):
+    cursor = conn.cursor(dictionary=True)
+    try:
+        plan = plan_summary(cursor, query, params)
+        # Reading the counters costs a few handler reads of its own
+        before = handler_reads(cursor)
+        overhead = handler_reads(cursor) - before
+
+        timings, rows_returned, rows_examined = [], 0, 0
+        for n in range(warmup + runs):
+            before = handler_reads(cursor)
+            started = time.perf_counter()
+            cursor.execute(query.sql, params)
+            rows = cursor.fetchall() if cursor.with_rows else []
+            elapsed = time.perf_counter() - started
+            # Undo writes and release any row locks (e.g. SELECT ... FOR UPDATE)
+            conn.rollback()
+            examined = max(0, handler_reads(cursor) - before - overhead)
+            if n >= warmup:
+                timings.append(elapsed * 1000)
+                rows_returned = len(rows) if query.kind == "SELECT" else cursor.rowcount
+                rows_examined = examined
+    finally:
+        cursor.close()
+
+    return {
+        "title": query.title,
+        **latency_summary(timings),
+        "rows_returned": rows_returned,
+        "rows_examined": rows_examined,
+        "plan": plan,
+    }
+
+
+def compare(results, baseline, threshold, min_delta_ms):
+    """Labels of queries whose p95 regressed against the baseline."""
+    regressions = []
+    for label, result in results.items():
+        before = baseline["queries"].get(label)
+        if not before:
+            continue
+        delta = result["p95_ms"] - before["p95_ms"]
+        if delta > min_delta_ms and result["p95_ms"] > before["p95_ms"] * (1 + threshold):
+            regressions.append(label)
+            print(
+                f"REGRESSION {label}: p95 {before['p95_ms']:.2f}ms -> {result['p95_ms']:.2f}ms "
+                f"(plan {before['plan']} -> {result['plan']})"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", default="default", help="label of the loaded dataset, e.g. 1m")
+    parser.add_argument("--runs", type=int, default=30)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--only", help="run only queries whose label contains this, e.g. admin.sql")
+    parser.add_argument("--output", type=Path, help="write results as a JSON baseline")
+    parser.add_argument("--compare", type=Path, help="baseline JSON to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed relative p95 increase")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="ignore p95 increases below this")
+    args = parser.parse_args()
+    if args.runs < 2:
+        parser.error("--runs must be at least 2")
+
+    results = {}
+    print(f"{'query':<18} {'p50':>9} {'p95':>9} {'p99':>9} {'rows':>8} {'examined':>10}  plan")
+    with get_pool().connection() as conn:
+        for query in load_catalog():
+            if query.kind not in BENCHMARKED or (args.only and args.only not in query.label):
+                continue
+            params = bind_params(query)
+            if params is None:
+                continue
+            try:
+                result = benchmark_query(conn, query, params, args.runs, args.warmup)
+            except Exception as e:
+                print(f"{query.label:<18} failed: {e}")
+                continue
+            results[query.label] = result
+            print(
+                f"{query.label:<18} {result['p50_ms']:>7.2f}ms {result['p95_ms']:>7.2f}ms "
+                f"{result['p99_ms']:>7.2f}ms {result['rows_returned']:>8} "
+                f"{result['rows_examined']:>10}  {result['plan']}"
+            )
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(
+            json.dumps(
+                {
+                    "scale": args.scale,
+                    "runs": args.runs,
+                    "created_at": datetime.now().isoformat(timespec="seconds"),
+                    "queries": results,
+                },
+                indent=2,
+            )
+        )
+        print(f"Baseline written to {args.output}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        if baseline.get("scale") != args.scale:
+            print(f"Warning: baseline scale {baseline.get('scale')!r} differs from {args.scale!r}")
+        if compare(results, baseline, args.threshold, args.min_delta_ms):
+            return 1
+        print("No regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
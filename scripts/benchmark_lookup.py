@@ -0,0 +1,82 @@
+"""Measure patient login lookup latency on the loaded dataset.
+
+Usage (from the repo root, after e.g. generate_data --patients 1000000):
+    python -m scripts.benchmark_lookup --samples 500
+
+Picks --samples random existing patients and looks each one up the way the
+login page does: by DOB + phone and by DOB + name prefix (services.patients).
+The old DOB-only query is measured too, for comparison.
+"""
+
+import argparse
+import random
+import sys
+import time
+
+from db_utils import run_query
+from scripts.benchmark import latency_summary
+from services.patients import find_patients
+
+
+def dob_only(dob):
+    return run_query(
+        "SELECT patient_id, first_name, last_name, phone_number, email FROM Patient WHERE dob = %s",
+        (dob,),
+        fetch=True,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--samples", type=int, default=300)
+    parser.add_argument("--prefix-length", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    bounds = run_query(
+        "SELECT MIN(patient_id) AS low, MAX(patient_id) AS high, COUNT(*) AS total FROM Patient",
+        fetch=True,
+    )
+    if not bounds or not bounds[0]["total"]:
+        print("No patients loaded")
+        return 1
+    low, high, total = bounds[0]["low"], bounds[0]["high"], bounds[0]["total"]
+
+    rng = random.Random(args.seed)
+    patients = []
+    while len(patients) < args.samples:
+        rows = run_query(
+            "SELECT dob, phone_number, last_name FROM Patient WHERE patient_id >= %s ORDER BY patient_id LIMIT 1",
+            (rng.randint(low, high),),
+            fetch=True,
+        )
+        if rows:
+            patients.append(rows[0])
+
+    lookups = {
+        "dob + phone": lambda p: find_patients(p["dob"], phone=p["phone_number"]),
+        "dob + name prefix": lambda p: find_patients(
+            p["dob"], name_prefix=p["last_name"][: args.prefix_length]
+        ),
+        "dob only (old login)": lambda p: dob_only(p["dob"]),
+    }
+
+    print(f"{total:,} patients, {args.samples} lookups per mode")
+    print(f"{'mode':<22} {'p50':>9} {'p95':>9} {'p99':>9} {'avg rows':>9}")
+    for mode, lookup in lookups.items():
+        timings, rows = [], 0
+        for patient in patients:
+            started = time.perf_counter()
+            result = lookup(patient) or []
+            timings.append((time.perf_counter() - started) * 1000)
+            rows += len(result)
+        summary = latency_summary(timings)
+        print(
+            f"{mode:<22} {summary['p50_ms']:>7.2f}ms {summary['p95_ms']:>7.2f}ms "
+            f"{summary['p99_ms']:>7.2f}ms {rows / len(patients):>9.1f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""Parse the query catalogue in database/*.sql and bind sample parameters to it.
+
+Every query the app runs is listed in database/patient.sql, doctor.sql and
+admin.sql under a numbered `-- N. Title` comment. Tools such as the EXPLAIN
+check and the benchmark use this module to run them against a live database.
+"""
+
+import re
+from pathlib import Path
+from typing import NamedTuple
+
+from db_utils import run_query
+
+DATABASE_DIR = Path(__file__).resolve().parent.parent / "database"
+CATALOG_FILES = ("patient.sql", "doctor.sql", "admin.sql")
+
+_HEADER = re.compile(r"^--\s*(\d+)\.\s*(.+?)\s*$")
+_COLUMN_BEFORE_PLACEHOLDER = re.compile(
+    r"(?:\w+\.)?(\w+)\s*(?:=|!=|<>|<=|>=|<|>|LIKE|IN\s*\()\s*$", re.IGNORECASE
+)
+_KEYWORD_BEFORE_PLACEHOLDER = re.compile(r"\b(LIMIT|OFFSET|AGAINST)\s*\(?\s*$", re.IGNORECASE)
+
+# Where to find a real value for a placeholder compared against a column
+SAMPLE_QUERIES = {
+    "dob": "SELECT dob AS value FROM Patient LIMIT 1",
+    "phone_number": "SELECT phone_number AS value FROM Patient LIMIT 1",
+    "last_name": "SELECT CONCAT(LEFT(last_name, 3), '%') AS value FROM Patient LIMIT 1",
+    "first_name": "SELECT CONCAT(LEFT(first_name, 3), '%') AS value FROM Patient LIMIT 1",
+    "patient_id": "SELECT patient_id AS value FROM Appointment LIMIT 1",
+    "appointment_id": "SELECT appointment_id AS value FROM Appointment LIMIT 1",
+    "appointment_datetime": "SELECT appointment_datetime AS value FROM Appointment LIMIT 1",
+    "schedule_id": "SELECT schedule_id AS value FROM Schedule LIMIT 1",
+    "doctor_id": "SELECT doctor_id AS value FROM Schedule LIMIT 1",
+    "specialization_id": "SELECT specialization_id AS value FROM Doctor LIMIT 1",
+    "slot_id": "SELECT slot_id AS value FROM Slot LIMIT 1",
+    "slot_date": "SELECT slot_date AS value FROM Slot LIMIT 1",
+    "issue_date": "SELECT issue_date AS value FROM Invoice LIMIT 1",
+}
+
+# Placeholders whose value does not depend on the data
+SAMPLE_LITERALS = {
+    "status": "scheduled",
+    "email": None,
+    "address": None,
+    "LIMIT": 20,
+    "OFFSET": 0,
+    "AGAINST": "+influenza*",
+}
+
+
+class CatalogQuery(NamedTuple):
+    file: str
+    number: int
+    title: str
+    sql: str
+
+    @property
+    def label(self):
+        return f"{self.file} #{self.number}"
+
+    @property
+    def kind(self):
+        return self.sql.split(None, 1)[0].upper()
+
+
+def load_catalog(files=CATALOG_FILES):
+    """Return every catalogued query, in file order."""
+    queries = []
+    for name in files:
+        current = None
+        lines = []
+        for line in (DATABASE_DIR / name).read_text().splitlines() + ["-- 0. end"]:
+            header = _HEADER.match(line.strip())
+            if header:
+                if current and "".join(lines).strip():
+                    sql = "\n".join(lines).strip().rstrip(";").strip()
+                    queries.append(CatalogQuery(name, current[0], current[1], sql))
+                current = (int(header.group(1)), header.group(2))
+                lines = []
+            elif not line.strip().startswith("--"):
+                lines.append(line)
+    return queries
+
+
+def placeholder_columns(sql):
+    """Column compared against each %s placeholder, or None if it is not a comparison."""
+    columns = []
+    for match in re.finditer(r"%s", sql):
+        before = sql[: match.start()]
+        keyword = _KEYWORD_BEFORE_PLACEHOLDER.search(before)
+        if keyword:
+            columns.append(keyword.group(1).upper())
+            continue
+        column = _COLUMN_BEFORE_PLACEHOLDER.search(before)
+        columns.append(column.group(1) if column else None)
+    return columns
+
+
+_sample_cache = {}
+
+
+def sample_value(column):
+    """A representative value for `column` taken from the live database."""
+    if column in SAMPLE_LITERALS:
+        return SAMPLE_LITERALS[column]
+    if column not in _sample_cache:
+        rows = run_query(SAMPLE_QUERIES[column], fetch=True)
+        _sample_cache[column] = rows[0]["value"] if rows else None
+    return _sample_cache[column]
+
+
+def bind_params(query):
+    """Parameters for a catalogued query, or None if it cannot be bound (e.g. INSERT ... VALUES)."""
+    columns = placeholder_columns(query.sql)
+    if any(column not in SAMPLE_QUERIES and column not in SAMPLE_LITERALS for column in columns):
+        return None
+    return tuple(sample_value(column) for column in columns)
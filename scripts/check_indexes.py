@@ -0,0 +1,79 @@
+"""Fail if any catalogued query does a full table scan on a large table.
+
+Usage (from the repo root, against a database seeded with a large dataset):
+    python -m scripts.check_indexes [--min-rows 1000]
+
+Every SELECT/UPDATE/DELETE in database/patient.sql, doctor.sql and admin.sql
+is EXPLAINed with sample parameters. A plan step with access type ALL on a
+table estimated at --min-rows rows or more is a failure, unless the query is
+an intentional full listing in ALLOWED_FULL_SCANS below.
+"""
+
+import argparse
+import sys
+
+from db_utils import transaction
+from scripts.catalog import bind_params, load_catalog
+
+# (file, number) -> table aliases that are expected to be read in full
+ALLOWED_FULL_SCANS = {
+    ("doctor.sql", 1): {"d", "s"},  # login lists every doctor
+    ("admin.sql", 4): {"sch", "d", "s"},  # lists every schedule
+    ("admin.sql", 5): {"a"},  # lists every appointment
+    ("admin.sql", 6): {"a"},  # lists every appointment with a status
+    ("admin.sql", 7): {"i"},  # lists every invoice
+    ("admin.sql", 8): {"a"},  # anti-join must visit every completed appointment
+}
+
+EXPLAINABLE = {"SELECT", "UPDATE", "DELETE"}
+
+
+def explain(query, params):
+    with transaction() as tx:
+        return tx.execute(f"EXPLAIN {query.sql}", params, fetch=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--min-rows",
+        type=int,
+        default=1000,
+        help="only flag full scans of tables estimated at this many rows or more",
+    )
+    args = parser.parse_args()
+
+    failures = 0
+    for query in load_catalog():
+        if query.kind not in EXPLAINABLE:
+            continue
+        params = bind_params(query)
+        if params is None:
+            print(f"SKIP  {query.label} {query.title} (cannot bind parameters)")
+            continue
+
+        allowed = ALLOWED_FULL_SCANS.get((query.file, query.number), set())
+        scans = [
+            step
+            for step in explain(query, params)
+            if step["type"] == "ALL"
+            and (step["rows"] or 0) >= args.min_rows
+            and step["table"] not in allowed
+            and not step["table"].startswith("<")  # derived tables
+        ]
+        if scans:
+            failures += 1
+            tables = ", ".join(f"{s['table']} (~{s['rows']} rows)" for s in scans)
+            print(f"FAIL  {query.label} {query.title}: full scan of {tables}")
+        else:
+            print(f"OK    {query.label} {query.title}")
+
+    if failures:
+        print(f"{failures} catalogued query(ies) do full table scans")
+        return 1
+    print("No unexpected full table scans")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""Render pages headlessly and fail if a view runs more SQL statements than budgeted.
+
+Usage (from the repo root, against a database with data loaded):
+    python -m scripts.check_query_budget [-v]
+
+Each case renders one page once with Streamlit's AppTest, starting from
+the given session state, and counts the statements db_utils executed.
+Exits non-zero if any case exceeds its budget or raised an exception.
+"""
+
+import argparse
+import sys
+import threading
+
+from streamlit.testing.v1 import AppTest
+
+from db_utils import query_stats
+
+# (page script, session state to start from, max statements per render)
+BUDGETS = [
+    ("pages/admin.py", {"admin_view": "invoices", "invoice_view": "View All Invoices"}, 1),
+    ("pages/admin.py", {"admin_view": "invoices", "invoice_view": "Create Invoice"}, 1),
+    ("pages/admin.py", {"admin_view": "invoices", "invoice_view": "Update Payment"}, 1),
+]
+
+
+class StatementCounter:
+    """query_stats listener collecting the statements run while it is attached."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.statements = []
+
+    def __call__(self, timer, seconds):
+        with self._lock:
+            self.statements.append(timer.query)
+
+    def __enter__(self):
+        query_stats.listeners.append(self)
+        return self
+
+    def __exit__(self, *exc):
+        query_stats.listeners.remove(self)
+
+
+def render_count(page, state):
+    """Statements run by one render of `page`, and the exceptions it raised."""
+    app = AppTest.from_file(page, default_timeout=60)
+    for key, value in state.items():
+        app.session_state[key] = value
+    with StatementCounter() as counter:
+        app.run()
+    return counter.statements, [e.value for e in app.exception]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-v", "--verbose", action="store_true", help="print every statement")
+    args = parser.parse_args()
+
+    failed = False
+    for page, state, budget in BUDGETS:
+        statements, errors = render_count(page, state)
+        label = f"{page} {state}"
+        ok = len(statements) <= budget and not errors
+        failed |= not ok
+        print(f"{'OK  ' if ok else 'FAIL'} {label}: {len(statements)} statement(s), budget {budget}")
+        for error in errors:
+            print(f"     exception: {error}")
+        if args.verbose or not ok:
+            for query in statements:
+                print(f"     {' '.join(query.split())[:120]}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+"""Show how reads are routed across the configured read replicas.
+
+Usage (from the repo root):
+    python -m scripts.check_replicas [--reads 100]
+    python -m scripts.check_replicas --replicas 127.0.0.1:3307,127.0.0.1:3308
+
+Runs --reads small SELECTs through run_query, counts which server answered
+each one (by @@server_id), then prints every replica's measured lag and
+health. Exits non-zero if replicas are configured but none of them served
+a read.
+"""
+
+import argparse
+import sys
+from collections import Counter
+
+from db_utils import configure_replicas, replica_stats, run_query
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reads", type=int, default=100)
+    parser.add_argument("--replicas", help="comma-separated host[:port] list (default: MYSQL_REPLICA_HOSTS)")
+    parser.add_argument("--max-lag", type=float, help="seconds of lag before a replica is skipped")
+    args = parser.parse_args()
+
+    if args.replicas or args.max_lag is not None:
+        settings = {} if args.max_lag is None else {"max_lag": args.max_lag}
+        addresses = args.replicas.split(",") if args.replicas else [
+            r["name"] for r in replica_stats()["replicas"]
+        ]
+        configure_replicas([a.strip() for a in addresses if a.strip()], **settings)
+
+    primary = run_query("SELECT @@server_id AS server_id", fetch=True, primary=True)
+    if not primary:
+        return 1
+    primary_id = primary[0]["server_id"]
+
+    served = Counter()
+    for _ in range(args.reads):
+        rows = run_query("SELECT @@server_id AS server_id", fetch=True)
+        served["error" if not rows else rows[0]["server_id"]] += 1
+
+    for server_id, count in served.most_common():
+        role = " (primary)" if server_id == primary_id else ""
+        print(f"server_id {server_id}{role}: {count} read(s)")
+
+    stats = replica_stats()
+    if not stats["replicas"]:
+        print("No replicas configured; every read uses the primary")
+        return 0
+    for r in stats["replicas"]:
+        lag = "unknown" if r["lag"] is None else f"{r['lag']}s"
+        state = "healthy" if r["healthy"] else f"skipped ({r['error'] or 'lagging'})"
+        print(f"{r['name']}: lag {lag}, {state}, {r['reads']} read(s) routed")
+
+    if not any(r["reads"] for r in stats["replicas"]):
+        print("FAIL: no read was routed to a replica")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,46 @@
+"""Export appointments or invoices to CSV or Parquet, streaming from the server.
+
+Usage (from the repo root):
+    python -m scripts.export appointments --output appointments.csv
+    python -m scripts.export invoices --format parquet --from 2025-01-01 --to 2025-03-31 --output q1.parquet
+
+Rows are read in --chunk-rows batches from an unbuffered cursor and written
+as they arrive, so memory stays flat regardless of the export size.
+Parquet needs pyarrow.
+"""
+
+import argparse
+import sys
+from datetime import date
+from pathlib import Path
+
+from services.export import CHUNK_ROWS, EXPORTS, FORMATS, export
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("name", choices=list(EXPORTS))
+    parser.add_argument("--output", type=Path, required=True)
+    parser.add_argument("--format", choices=FORMATS, help="default: from the output file extension")
+    parser.add_argument("--from", dest="start_date", type=date.fromisoformat, help="first day (inclusive)")
+    parser.add_argument("--to", dest="end_date", type=date.fromisoformat, help="last day (inclusive)")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    args = parser.parse_args()
+
+    fmt = args.format or args.output.suffix.lstrip(".").lower()
+    if fmt not in FORMATS:
+        parser.error("cannot tell the format from the file extension; pass --format")
+
+    try:
+        result = export(args.name, fmt, args.output, args.start_date, args.end_date, args.chunk_rows)
+    except Exception as e:
+        print(f"Export failed: {e}")
+        return 1
+
+    rate = result["rows"] / result["seconds"] if result["seconds"] else 0
+    print(f"Exported {result['rows']} row(s) to {args.output} in {result['seconds']:.1f}s ({rate:,.0f} rows/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,324 @@
+"""Generate a large, referentially consistent synthetic dataset for load and scaling tests.
+
+Usage (from the repo root, against an empty database with schema + migrations):
+    python -m scripts.generate_data --patients 1000000 --doctors 8100 --appointments 20000000
+    python -m scripts.generate_data --patients 10000 --appointments 100000 --method insert
+
+Every table is filled from one seeded random generator, so the same arguments
+always produce the same rows. Each dated slot is booked at most once, so
+--appointments may not exceed doctors x days-per-doctor x slots-per-day x
+weeks of history. Rows are written to CSV files and bulk loaded with LOAD
+DATA LOCAL INFILE (the server needs local_infile=ON), or sent as batched
+multi-row INSERTs with --method insert. --reset empties the tables first.
+The dashboard summary tables are rebuilt at the end.
+"""
+
+import argparse
+import csv
+import math
+import random
+import sys
+import tempfile
+import time
+from contextlib import ExitStack
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from db_utils import get_connection
+from services.slots import generate_slots
+from services.summary import rebuild_summary
+
+SPECIALIZATIONS = [
+    ("General Practitioner", 150000),
+    ("Dermatology", 200000),
+    ("Dentist", 190000),
+    ("Pediatrics", 180000),
+    ("Cardiology", 300000),
+    ("Neurology", 320000),
+    ("Orthopedics", 280000),
+    ("Ophthalmology", 250000),
+    ("Otolaryngology", 240000),
+    ("Psychiatry", 350000),
+    ("Obstetrics & Gynecology", 270000),
+    ("Internal Medicine", 220000),
+]
+
+FIRST_NAMES = [
+    "Amy", "Mark", "Jacob", "Michelle", "Linda", "Brian", "Agung", "Deni", "Siti",
+    "Katrina", "Budi", "Dewi", "Rina", "Andi", "Putri", "Eko", "Sari", "Yusuf",
+    "Indah", "Hendra", "Maria", "Kevin", "Nadia", "Rudi", "Fitri", "Joko", "Lina",
+    "Ahmad", "Wati", "Tommy", "Citra", "Fajar", "Ayu", "Bayu", "Intan", "Reza",
+]
+LAST_NAMES = [
+    "Kim", "Lee", "Tan", "Ming", "Wong", "Simanjuntak", "Putra", "Wulandari",
+    "Hartono", "Chandra", "Santoso", "Wijaya", "Halim", "Gunawan", "Saputra",
+    "Siregar", "Nasution", "Lubis", "Hidayat", "Kusuma", "Pratama", "Setiawan",
+    "Sutanto", "Lim", "Tanoto", "Salim", "Harahap", "Sihombing", "Rahman",
+]
+STREETS = ["Merdeka", "Sudirman", "Thamrin", "Gatot Subroto", "Mangga", "Bali", "Diponegoro", "Asia Afrika"]
+
+VISITS = [
+    ("Annual checkup", "Healthy", "Multivitamin", "Routine annual exam, no issues."),
+    ("Flu symptoms", "Influenza Type A", "Oseltamivir 75mg, Paracetamol 500mg", "Rest for 3-5 days. Return if symptoms worsen."),
+    ("Skin rash evaluation", "Contact dermatitis", "Hydrocortisone cream 1%", "Avoid the suspected irritant."),
+    ("Acne treatment", "Acne vulgaris", "Benzoyl peroxide 5% gel", "Follow-up in 6 weeks."),
+    ("Dental cleaning", "Mild gingivitis", "Chlorhexidine mouthwash", "Improve flossing routine."),
+    ("Toothache", "Dental caries", "Amoxicillin 500mg, Ibuprofen 400mg", "Filling scheduled."),
+    ("Headache", "Tension headache", "Paracetamol 500mg", "Reduce screen time, hydrate."),
+    ("Chest pain", "Costochondritis", "Ibuprofen 400mg", "ECG normal. Return if pain persists."),
+    ("Back pain", "Lumbar strain", "Naproxen 250mg", "Physiotherapy recommended."),
+    ("Fever", "Dengue fever suspected", "Paracetamol 500mg, oral rehydration", "Platelet check in 2 days."),
+    ("Cough", "Acute bronchitis", "Ambroxol 30mg", "Avoid smoking."),
+    ("Follow-up", "Recovered", "Continue vitamin C", "Patient recovered well. No further treatment needed."),
+    ("Blood pressure check", "Hypertension stage 1", "Amlodipine 5mg", "Low-salt diet, recheck in 1 month."),
+    ("Eye irritation", "Allergic conjunctivitis", "Olopatadine eye drops", "Avoid rubbing eyes."),
+]
+
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]
+SLOT_MINUTES = 30
+NULL = "\\N"  # LOAD DATA marker for SQL NULL
+
+COLUMNS = {
+    "Specialization": ("specialization_id", "specialization_name", "consultation_fee"),
+    "Doctor": ("doctor_id", "specialization_id", "first_name", "last_name", "phone_number", "email"),
+    "Schedule": ("schedule_id", "doctor_id", "available_day", "start_time", "end_time", "is_booked"),
+    "Patient": ("patient_id", "first_name", "last_name", "dob", "gender", "phone_number", "email", "address"),
+    "Appointment": ("appointment_id", "patient_id", "schedule_id", "reason_for_visit", "appointment_datetime", "status"),
+    "Record": ("appointment_id", "diagnosis", "prescription", "notes"),
+    "Invoice": ("appointment_id", "amount", "issue_date", "status"),
+}
+LOAD_ORDER = list(COLUMNS)
+
+
+def history_weeks(args):
+    return max(1, args.days // 7)
+
+
+def slot_capacity(args):
+    """Dated slots available over the history: one appointment each at most."""
+    return args.doctors * args.days_per_doctor * args.slots_per_day * history_weeks(args)
+
+
+def generate(args):
+    """Yield (table, row) for every generated row, table by table."""
+    rng = random.Random(args.seed)
+
+    for spec_id, (name, fee) in enumerate(SPECIALIZATIONS, start=1):
+        yield "Specialization", (spec_id, name, fee)
+
+    doctor_fee = {}
+    for doctor_id in range(1, args.doctors + 1):
+        spec_id = rng.randint(1, len(SPECIALIZATIONS))
+        doctor_fee[doctor_id] = SPECIALIZATIONS[spec_id - 1][1]
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        yield "Doctor", (
+            doctor_id, spec_id, f"dr. {first}", last,
+            f"0812{doctor_id:08d}", f"{first}.{last}.{doctor_id}@clinic.com".lower(),
+        )
+
+    # Weekly template: each doctor works a few days, a block of slots per day
+    slots = []  # (schedule_id, doctor_id, weekday index, start time)
+    schedule_id = 0
+    for doctor_id in range(1, args.doctors + 1):
+        for day in sorted(rng.sample(range(len(WEEKDAYS)), args.days_per_doctor)):
+            first_slot = datetime(2000, 1, 1, rng.choice([8, 9, 13]))
+            for n in range(args.slots_per_day):
+                schedule_id += 1
+                start = first_slot + timedelta(minutes=SLOT_MINUTES * n)
+                slots.append((schedule_id, doctor_id, day, start.time()))
+    booked = set()
+
+    for patient_id in range(1, args.patients + 1):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        dob = date(1940, 1, 1) + timedelta(days=rng.randrange(80 * 365))
+        yield "Patient", (
+            patient_id, first, last, dob, rng.choice(["Male", "Female"]),
+            f"08{rng.randrange(10**10):010d}",
+            f"{first}.{last}{patient_id}@example.com".lower() if rng.random() < 0.7 else NULL,
+            f"Jl. {rng.choice(STREETS)} {rng.randint(1, 300)}" if rng.random() < 0.8 else NULL,
+        )
+
+    # Each dated slot (template, week) is booked at most once: walk a seeded
+    # permutation of all slot instances, i -> (a * i + b) mod capacity with
+    # a coprime to capacity, which needs no memory however large the dataset
+    start_date = args.start
+    weeks = history_weeks(args)
+    capacity = len(slots) * weeks
+    step = rng.randrange(1, capacity)
+    while math.gcd(step, capacity) != 1:
+        step = rng.randrange(1, capacity)
+    offset = rng.randrange(capacity)
+    for appointment_id in range(1, args.appointments + 1):
+        instance = (step * (appointment_id - 1) + offset) % capacity
+        schedule_id, doctor_id, weekday, start_time = slots[instance % len(slots)]
+        week_start = start_date + timedelta(weeks=instance // len(slots))
+        day = week_start + timedelta(days=(weekday - week_start.weekday()) % 7)
+        appointment_datetime = datetime.combine(day, start_time)
+        reason, diagnosis, prescription, notes = rng.choice(VISITS)
+
+        if day < args.as_of:
+            status = "completed" if rng.random() < 0.85 else "cancelled"
+        else:
+            status = "scheduled" if rng.random() < 0.9 else "cancelled"
+            if status == "scheduled":
+                booked.add(schedule_id)
+
+        yield "Appointment", (
+            appointment_id, rng.randint(1, args.patients), schedule_id,
+            reason if rng.random() < 0.9 else NULL, appointment_datetime, status,
+        )
+        if status == "completed":
+            yield "Record", (appointment_id, diagnosis, prescription, notes if rng.random() < 0.8 else NULL)
+            if rng.random() < 0.95:
+                issue_date = day + timedelta(days=rng.randint(0, 3))
+                paid = (args.as_of - issue_date).days > 30 or rng.random() < 0.5
+                yield "Invoice", (appointment_id, doctor_fee[doctor_id], issue_date, "paid" if paid else "unpaid")
+
+    # Schedules last: is_booked depends on the generated appointments
+    for schedule_id, doctor_id, weekday, start_time in slots:
+        end_time = (datetime.combine(date.min, start_time) + timedelta(minutes=SLOT_MINUTES)).time()
+        yield "Schedule", (
+            schedule_id, doctor_id, WEEKDAYS[weekday], start_time, end_time,
+            1 if schedule_id in booked else 0,
+        )
+
+
+def prepare(conn, reset):
+    cursor = conn.cursor()
+    # Rows are consistent by construction; skip per-row checks while loading
+    cursor.execute("SET SESSION foreign_key_checks = 0")
+    cursor.execute("SET SESSION unique_checks = 0")
+    if reset:
+        for table in reversed(LOAD_ORDER):
+            cursor.execute(f"TRUNCATE TABLE {table}")
+    cursor.close()
+
+
+def load_with_infile(conn, rows, workdir):
+    """Write one CSV per table, then LOAD DATA LOCAL INFILE each of them."""
+    counts = dict.fromkeys(LOAD_ORDER, 0)
+    # ExitStack closes every CSV even if generating a row fails part way
+    with ExitStack() as stack:
+        writers = {
+            table: csv.writer(stack.enter_context(open(Path(workdir) / f"{table}.csv", "w", newline="")))
+            for table in LOAD_ORDER
+        }
+        for table, row in rows:
+            writers[table].writerow(row)
+            counts[table] += 1
+
+    cursor = conn.cursor()
+    for table in LOAD_ORDER:
+        started = time.perf_counter()
+        cursor.execute(
+            f"""
+            LOAD DATA LOCAL INFILE '{Path(workdir, table + ".csv").as_posix()}'
+            INTO TABLE {table}
+            FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"'
+            LINES TERMINATED BY '\\r\\n'
+            ({", ".join(COLUMNS[table])})
+            """
+        )
+        conn.commit()
+        print(f"  {table}: {counts[table]:,} rows in {time.perf_counter() - started:.1f}s")
+    cursor.close()
+
+
+def load_with_inserts(conn, rows, batch_size):
+    """Buffer rows per table and send them as multi-row INSERTs."""
+    cursor = conn.cursor()
+    buffers = {table: [] for table in LOAD_ORDER}
+    counts = dict.fromkeys(LOAD_ORDER, 0)
+
+    def flush(table):
+        columns = COLUMNS[table]
+        # executemany() rewrites INSERT ... VALUES into one multi-row statement
+        cursor.executemany(
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})",
+            [tuple(None if v == NULL else v for v in row) for row in buffers[table]],
+        )
+        conn.commit()
+        counts[table] += len(buffers[table])
+        buffers[table].clear()
+
+    for table, row in rows:
+        buffers[table].append(row)
+        if len(buffers[table]) >= batch_size:
+            flush(table)
+    for table in LOAD_ORDER:
+        if buffers[table]:
+            flush(table)
+    cursor.close()
+
+    for table in LOAD_ORDER:
+        print(f"  {table}: {counts[table]:,} rows")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--patients", type=int, default=100_000)
+    parser.add_argument("--doctors", type=int, default=500)
+    parser.add_argument("--appointments", type=int, default=1_000_000)
+    parser.add_argument("--days-per-doctor", type=int, default=3, help="working days per week (max 6)")
+    parser.add_argument("--slots-per-day", type=int, default=8)
+    parser.add_argument("--start", type=date.fromisoformat, default=date(2024, 1, 1), help="first appointment date")
+    parser.add_argument("--days", type=int, default=730, help="length of the appointment history")
+    parser.add_argument(
+        "--as-of", type=date.fromisoformat, default=None,
+        help="'today' for statuses: earlier appointments are completed/cancelled, later ones scheduled "
+        "(default: 90%% into the date range)",
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--method", choices=["infile", "insert"], default="infile")
+    parser.add_argument("--batch-size", type=int, default=5000, help="rows per INSERT with --method insert")
+    parser.add_argument("--reset", action="store_true", help="TRUNCATE all tables first")
+    args = parser.parse_args()
+    args.days_per_doctor = min(args.days_per_doctor, len(WEEKDAYS))
+    if args.as_of is None:
+        args.as_of = args.start + timedelta(days=int(args.days * 0.9))
+    if args.appointments > slot_capacity(args):
+        per_doctor = slot_capacity(args) // args.doctors
+        parser.error(
+            f"--appointments {args.appointments} exceeds the {slot_capacity(args)} dated slots "
+            f"of {args.doctors} doctors over {args.days} days; use --doctors "
+            f"{-(-args.appointments // per_doctor)} or more (or raise --days-per-doctor/--slots-per-day/--days)"
+        )
+
+    conn = get_connection(allow_local_infile=args.method == "infile")
+    if conn is None:
+        return 1
+
+    started = time.perf_counter()
+    try:
+        prepare(conn, args.reset)
+        rows = generate(args)
+        if args.method == "infile":
+            with tempfile.TemporaryDirectory() as workdir:
+                load_with_infile(conn, rows, workdir)
+        else:
+            load_with_inserts(conn, rows, args.batch_size)
+    except Exception as e:
+        print(f"Data generation failed: {e}")
+        return 1
+    finally:
+        conn.close()
+    print(f"Loaded in {time.perf_counter() - started:.1f}s")
+
+    # TRUNCATE skips the summary triggers, so rebuild the aggregates from scratch
+    try:
+        rebuild_summary()
+        print("Dashboard summary rebuilt")
+    except Exception as e:
+        print(f"Could not rebuild dashboard summary (is migration 003 applied?): {e}")
+
+    # Dated slots are derived from the freshly loaded templates and appointments
+    try:
+        counts = generate_slots(rebuild=True)
+        print(f"{counts['created']} slots generated, {counts['linked']} booked")
+    except Exception as e:
+        print(f"Could not generate slots (is migration 006 applied?): {e}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
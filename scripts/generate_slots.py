@@ -0,0 +1,41 @@
+"""Materialize dated slot instances from the weekly Schedule templates.
+
+Usage (from the repo root, e.g. daily from cron):
+    python -m scripts.generate_slots --horizon-days 28
+
+Creates the Slot rows for today through the horizon that do not exist yet,
+frees slots whose appointment was deleted, links upcoming scheduled
+appointments to their slot and deletes unbooked slots that have started.
+Safe to run repeatedly.
+"""
+
+import argparse
+import sys
+
+from services.slots import HORIZON_DAYS, generate_slots
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--horizon-days", type=int, default=HORIZON_DAYS)
+    parser.add_argument("--rebuild", action="store_true", help="delete every slot first and regenerate")
+    args = parser.parse_args()
+    if args.horizon_days < 1:
+        parser.error("--horizon-days must be at least 1")
+
+    try:
+        counts = generate_slots(args.horizon_days, rebuild=args.rebuild)
+    except Exception as e:
+        print(f"Slot generation failed: {e}")
+        return 1
+
+    print(
+        f"{counts['created']} slot(s) created, {counts['released']} orphaned slot(s) freed, "
+        f"{counts['linked']} linked to appointments, "
+        f"{counts['expired']} expired slot(s) removed"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+"""Bulk-import patients from a CSV file.
+
+Usage (from the repo root):
+    python -m scripts.import_patients patients.csv [--dry-run] [--batch-size 1000]
+
+The CSV needs a header row with first_name, last_name, dob (YYYY-MM-DD),
+gender (Male/Female) and phone_number; email and address are optional.
+Invalid rows are reported and skipped, patients that already exist (same
+name, dob and phone number) are skipped, and the rest are inserted in
+batched multi-row statements, one transaction per batch. If a batch fails,
+the earlier batches stay committed and re-running the file skips them.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from services.patient_import import (
+    BATCH_SIZE,
+    ImportInterrupted,
+    import_patients,
+    parse_patients,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("csv_file", type=Path)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--dry-run", action="store_true", help="validate and de-duplicate without inserting")
+    parser.add_argument("--max-errors", type=int, default=20, help="invalid rows to print")
+    args = parser.parse_args()
+
+    with args.csv_file.open(newline="", encoding="utf-8-sig") as f:
+        rows, errors, repeated = parse_patients(f)
+
+    for line, message in errors[: args.max_errors]:
+        print(f"line {line}: {message}")
+    if len(errors) > args.max_errors:
+        print(f"... and {len(errors) - args.max_errors} more invalid row(s)")
+
+    try:
+        result = import_patients(rows, args.batch_size, dry_run=args.dry_run)
+    except ImportInterrupted as e:
+        print(f"Import stopped, {e}; re-run the file to insert the rest")
+        return 1
+    except Exception as e:
+        print(f"Import failed, nothing was inserted: {e}")
+        return 1
+
+    verb = "would be inserted" if args.dry_run else "inserted"
+    print(
+        f"{result['inserted']} patient(s) {verb}, {result['existing']} already existed, "
+        f"{repeated} repeated in the file, {len(errors)} invalid"
+    )
+    print(f"{result['seconds']:.2f}s ({result['rows_per_sec']:,.0f} rows/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
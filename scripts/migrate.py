@@ -0,0 +1,94 @@
+"""Apply the versioned migrations in database/migrations to the configured database.
+
+Usage (from the repo root):
+    python -m scripts.migrate            # apply everything not yet applied
+    python -m scripts.migrate --status   # list applied / pending versions
+
+Each file is named <version>_<name>.sql and applied once, in version order.
+Applied versions are recorded in the schema_migrations table.
+"""
+
+import argparse
+import re
+import sys
+from pathlib import Path
+
+from db_utils import transaction
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent.parent / "database" / "migrations"
+
+
+def split_statements(sql):
+    """Split a migration file into statements, dropping `--` comment lines."""
+    lines = [line for line in sql.splitlines() if not line.strip().startswith("--")]
+    return [stmt.strip() for stmt in "\n".join(lines).split(";") if stmt.strip()]
+
+
+def list_migrations():
+    """Return (version, path) for every migration file, in version order."""
+    migrations = []
+    for path in sorted(MIGRATIONS_DIR.glob("*.sql")):
+        match = re.match(r"(\d+)_", path.name)
+        if match:
+            migrations.append((match.group(1), path))
+    return migrations
+
+
+def applied_versions():
+    with transaction() as tx:
+        tx.execute(
+            """
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version VARCHAR(20) PRIMARY KEY,
+                name VARCHAR(255) NOT NULL,
+                applied_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+            )
+            """
+        )
+        rows = tx.execute("SELECT version FROM schema_migrations", fetch=True)
+    return {row["version"] for row in rows}
+
+
+def apply(version, path):
+    print(f"Applying {path.name} ...")
+    # MySQL commits DDL implicitly, so statements run one by one and the
+    # version is only recorded once all of them succeeded
+    for statement in split_statements(path.read_text()):
+        with transaction() as tx:
+            tx.execute(statement)
+    with transaction() as tx:
+        tx.execute(
+            "INSERT INTO schema_migrations (version, name) VALUES (%s, %s)",
+            (version, path.name),
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--status", action="store_true", help="only list migrations")
+    args = parser.parse_args()
+
+    done = applied_versions()
+    pending = [(v, p) for v, p in list_migrations() if v not in done]
+
+    if args.status:
+        for version, path in list_migrations():
+            print(f"{'applied' if version in done else 'pending':8} {path.name}")
+        return 0
+
+    if not pending:
+        print("Database is up to date")
+        return 0
+
+    for version, path in pending:
+        try:
+            apply(version, path)
+        except Exception as e:
+            print(f"Migration {path.name} failed: {e}")
+            return 1
+    print(f"Applied {len(pending)} migration(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,32 @@
+"""Rebuild the dashboard summary tables from Appointment and Invoice.
+
+Usage (from the repo root, e.g. nightly from cron):
+    python -m scripts.reconcile_summary
+
+The triggers from migration 003 keep the summaries current; this repairs any
+drift (e.g. rows removed by ON DELETE CASCADE, which skip triggers) and
+reports what it corrected.
+"""
+
+import sys
+
+from services.summary import rebuild_summary
+
+
+def main():
+    try:
+        drift = rebuild_summary()
+    except Exception as e:
+        print(f"Reconciliation failed: {e}")
+        return 1
+
+    if not drift:
+        print("Summary tables were already correct")
+    for table, changes in drift.items():
+        for status, (stored, actual) in sorted(changes.items()):
+            print(f"{table}[{status}]: {stored} -> {actual}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
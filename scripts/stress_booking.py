@@ -0,0 +1,98 @@
+"""Hammer one slot from many threads and check exactly one booking wins.
+
+Usage (from the repo root, against a disposable database):
+    python -m scripts.stress_booking --slot-id 305 --patient-id 101 --threads 50
+
+The slot must not have started yet (started slots cannot be claimed) and
+is freed before the run; the winning appointment is deleted and the
+slot freed again afterwards unless --keep is given. Exits non-zero if the
+number of winners is not exactly one.
+"""
+
+import argparse
+import sys
+import threading
+
+from db_utils import configure_pool, run_query, transaction
+from services.booking import SlotUnavailable, book_slot
+
+
+def run_round(args, round_no):
+    """Free the slot, race args.threads bookings for it and return (winners, losers, errors)."""
+    run_query(
+        "UPDATE Slot SET is_booked = FALSE, appointment_id = NULL WHERE slot_id = %s",
+        (args.slot_id,),
+    )
+
+    barrier = threading.Barrier(args.threads)
+    winners, losers, errors = [], [], []
+    lock = threading.Lock()
+
+    def attempt(n):
+        barrier.wait()
+        try:
+            appointment_id = book_slot(
+                args.patient_id, args.slot_id, f"stress test {round_no}/{n}"
+            )
+            with lock:
+                winners.append(appointment_id)
+        except SlotUnavailable:
+            with lock:
+                losers.append(n)
+        except Exception as e:
+            with lock:
+                errors.append(e)
+
+    threads = [
+        threading.Thread(target=attempt, args=(n,)) for n in range(args.threads)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return winners, losers, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--slot-id", type=int, required=True)
+    parser.add_argument("--patient-id", type=int, required=True)
+    parser.add_argument("--threads", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=1)
+    parser.add_argument("--keep", action="store_true", help="keep the winning booking")
+    args = parser.parse_args()
+
+    # One connection per thread so every attempt really races on the server
+    configure_pool(size=args.threads, timeout=60)
+
+    failed = False
+    for round_no in range(1, args.rounds + 1):
+        winners, losers, errors = run_round(args, round_no)
+
+        print(
+            f"Round {round_no}: {len(winners)} winner(s), "
+            f"{len(losers)} rejected, {len(errors)} error(s)"
+        )
+        for e in errors:
+            print(f"  error: {e}")
+        if len(winners) != 1 or errors:
+            failed = True
+
+        if not args.keep:
+            with transaction() as tx:
+                for appointment_id in winners:
+                    tx.execute(
+                        "DELETE FROM Appointment WHERE appointment_id = %s",
+                        (appointment_id,),
+                    )
+                tx.execute(
+                    "UPDATE Slot SET is_booked = FALSE, appointment_id = NULL WHERE slot_id = %s",
+                    (args.slot_id,),
+                )
+
+    print("FAIL" if failed else "OK: exactly one winner per round")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
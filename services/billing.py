@@ -0,0 +1,71 @@
+import time
+
+from db_utils import transaction
+
+
+def invoice_eligible_appointments(start_date=None, end_date=None):
+    """Invoice every completed appointment that has no invoice yet.
+
+    One set-based INSERT ... SELECT (admin.sql #8 with the specialization's
+    consultation fee as amount), optionally limited to appointments between
+    start_date and end_date inclusive. Returns {"created": n, "seconds": t}.
+    """
+    query = """
+        INSERT INTO Invoice (appointment_id, amount, issue_date, status)
+        SELECT a.appointment_id, s.consultation_fee, CURDATE(), 'unpaid'
+        FROM Appointment a
+        JOIN Schedule sch     ON a.schedule_id = sch.schedule_id
+        JOIN Doctor d         ON sch.doctor_id = d.doctor_id
+        JOIN Specialization s ON d.specialization_id = s.specialization_id
+        LEFT JOIN Invoice i   ON a.appointment_id = i.appointment_id
+        WHERE a.status = 'completed' AND i.appointment_id IS NULL
+    """
+    params = []
+    if start_date:
+        query += " AND a.appointment_datetime >= %s"
+        params.append(start_date)
+    if end_date:
+        query += " AND a.appointment_datetime < %s + INTERVAL 1 DAY"
+        params.append(end_date)
+
+    start = time.perf_counter()
+    with transaction() as tx:
+        created = tx.execute(query, tuple(params))
+    return {"created": created, "seconds": time.perf_counter() - start}
+
+
+def mark_invoices_paid(appointment_ids, chunk_size=1000):
+    """Mark a set of invoices paid in one transaction.
+
+    Invoices are identified by appointment_id. Returns
+    {"paid": [...], "already_paid": [...], "not_found": [...]}, each sorted.
+    """
+    ids = sorted(set(appointment_ids))
+    paid, already_paid, found = [], [], set()
+
+    with transaction() as tx:
+        for i in range(0, len(ids), chunk_size):
+            chunk = ids[i : i + chunk_size]
+            placeholders = ", ".join(["%s"] * len(chunk))
+            # Lock the rows so the report matches what the UPDATE changed
+            rows = tx.execute(
+                f"SELECT appointment_id, status FROM Invoice WHERE appointment_id IN ({placeholders}) FOR UPDATE",
+                tuple(chunk),
+                fetch=True,
+            )
+            for row in rows:
+                found.add(row["appointment_id"])
+                if row["status"] == "paid":
+                    already_paid.append(row["appointment_id"])
+                else:
+                    paid.append(row["appointment_id"])
+            tx.execute(
+                f"UPDATE Invoice SET status = 'paid' WHERE appointment_id IN ({placeholders}) AND status <> 'paid'",
+                tuple(chunk),
+            )
+
+    return {
+        "paid": sorted(paid),
+        "already_paid": sorted(already_paid),
+        "not_found": [i for i in ids if i not in found],
+    }
@@ -0,0 +1,44 @@
+from db_utils import transaction
+
+
+class SlotUnavailable(Exception):
+    """Raised when a slot was already booked by someone else or has already started."""
+
+
+def book_slot(patient_id, slot_id, reason):
+    """Claim a dated slot and create its appointment in one transaction.
+
+    The claim is a conditional UPDATE: InnoDB row-locks the slot, so of any
+    number of concurrent callers exactly one sees an affected row count of 1.
+    Everyone else gets SlotUnavailable and nothing is written. A slot whose
+    start time has passed cannot be claimed, even from a stale page.
+    Returns the new appointment_id.
+    """
+    with transaction() as tx:
+        claimed = tx.execute(
+            "UPDATE Slot SET is_booked = TRUE "
+            "WHERE slot_id = %s AND is_booked = FALSE AND TIMESTAMP(slot_date, start_time) > NOW()",
+            (slot_id,),
+        )
+        if claimed != 1:
+            raise SlotUnavailable(f"Slot {slot_id} is no longer available")
+
+        tx.execute(
+            "INSERT INTO Appointment (patient_id, schedule_id, reason_for_visit, appointment_datetime, status) "
+            "SELECT %s, schedule_id, %s, TIMESTAMP(slot_date, start_time), 'scheduled' FROM Slot WHERE slot_id = %s",
+            (patient_id, reason, slot_id),
+        )
+        appointment_id = tx.lastrowid
+        tx.execute(
+            "UPDATE Slot SET appointment_id = %s WHERE slot_id = %s",
+            (appointment_id, slot_id),
+        )
+        return appointment_id
+
+
+def release_slot(tx, appointment_id):
+    """Free the slot held by an appointment, inside the caller's transaction."""
+    return tx.execute(
+        "UPDATE Slot SET is_booked = FALSE, appointment_id = NULL WHERE appointment_id = %s",
+        (appointment_id,),
+    )
@@ -0,0 +1,134 @@
+import csv
+import time
+
+from db_utils import stream_query
+
+CHUNK_ROWS = 10_000
+
+# admin.sql #5 and #7, ranged on their date column and ordered along its index
+EXPORTS = {
+    "appointments": (
+        """
+        SELECT
+            a.appointment_id,
+            a.appointment_datetime,
+            a.status,
+            a.reason_for_visit,
+            p.first_name AS patient_first,
+            p.last_name AS patient_last,
+            p.phone_number,
+            d.first_name AS doctor_first,
+            d.last_name AS doctor_last,
+            s.specialization_name
+        FROM Appointment a
+        JOIN Patient p ON a.patient_id = p.patient_id
+        JOIN Schedule sch ON a.schedule_id = sch.schedule_id
+        JOIN Doctor d ON sch.doctor_id = d.doctor_id
+        JOIN Specialization s ON d.specialization_id = s.specialization_id
+        """,
+        "a.appointment_datetime",
+        "a.appointment_datetime, a.appointment_id",
+    ),
+    "invoices": (
+        """
+        SELECT
+            i.appointment_id,
+            i.amount,
+            i.issue_date,
+            i.status,
+            p.first_name AS patient_first,
+            p.last_name AS patient_last,
+            a.appointment_datetime,
+            a.reason_for_visit
+        FROM Invoice i
+        JOIN Appointment a ON i.appointment_id = a.appointment_id
+        JOIN Patient p ON a.patient_id = p.patient_id
+        """,
+        "i.issue_date",
+        "i.issue_date, i.appointment_id",
+    ),
+}
+FORMATS = ("csv", "parquet")
+
+
+def export_batches(name, start_date=None, end_date=None, chunk_rows=CHUNK_ROWS):
+    """Yield the rows of an export in lists of at most chunk_rows dicts.
+
+    Dates are inclusive. Rows come off an unbuffered cursor (stream_query),
+    so memory holds one chunk however large the export is.
+    """
+    query, date_column, order = EXPORTS[name]
+    conditions, params = [], []
+    if start_date:
+        conditions.append(f"{date_column} >= %s")
+        params.append(start_date)
+    if end_date:
+        conditions.append(f"{date_column} < %s + INTERVAL 1 DAY")
+        params.append(end_date)
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += f" ORDER BY {order}"
+    yield from stream_query(query, tuple(params), batch_size=chunk_rows)
+
+
+def write_csv(batches, out):
+    """Write batches to a text file object as CSV with a header row. Returns the row count."""
+    writer = None
+    count = 0
+    for rows in batches:
+        if writer is None:
+            writer = csv.DictWriter(out, fieldnames=list(rows[0]))
+            writer.writeheader()
+        writer.writerows(rows)
+        count += len(rows)
+    return count
+
+
+def write_parquet(batches, path):
+    """Write batches to a Parquet file, one row group per batch. Returns the row count.
+
+    Needs pyarrow (pip install pyarrow). Column types are inferred from the
+    first batch (all-NULL columns become strings); an export with no rows
+    writes no file.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise RuntimeError("Parquet export needs pyarrow: pip install pyarrow") from e
+
+    writer = None
+    count = 0
+    try:
+        for rows in batches:
+            table = pa.Table.from_pylist(rows, schema=writer.schema if writer else None)
+            if writer is None:
+                # A column that is all NULL in the first batch would be typed null
+                schema = pa.schema(
+                    f.with_type(pa.string()) if pa.types.is_null(f.type) else f for f in table.schema
+                )
+                table = table.cast(schema)
+                writer = pq.ParquetWriter(path, schema)
+            writer.write_table(table)
+            count += len(rows)
+    finally:
+        if writer is not None:
+            writer.close()
+    return count
+
+
+def export(name, fmt, path, start_date=None, end_date=None, chunk_rows=CHUNK_ROWS):
+    """Stream an export to `path` as CSV or Parquet. Returns {"rows": n, "seconds": t}."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}, expected one of {FORMATS}")
+    start = time.perf_counter()
+    batches = export_batches(name, start_date, end_date, chunk_rows)
+    try:
+        if fmt == "csv":
+            with open(path, "w", newline="", encoding="utf-8") as out:
+                rows = write_csv(batches, out)
+        else:
+            rows = write_parquet(batches, path)
+    finally:
+        batches.close()  # release the connection if a writer failed mid-stream
+    return {"rows": rows, "seconds": time.perf_counter() - start}
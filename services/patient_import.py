@@ -0,0 +1,136 @@
+import csv
+import re
+import time
+from datetime import date
+
+from db_utils import transaction
+
+BATCH_SIZE = 1000
+REQUIRED = ("first_name", "last_name", "dob", "gender", "phone_number")
+OPTIONAL = ("email", "address")
+COLUMNS = REQUIRED + OPTIONAL
+GENDERS = {"male": "Male", "female": "Female"}
+MAX_LENGTH = {"first_name": 50, "last_name": 50, "phone_number": 25, "email": 100, "address": 255}
+_PHONE = re.compile(r"\+?[0-9 ()-]{6,25}")
+
+
+class ImportInterrupted(Exception):
+    """Raised when a batch fails; `inserted` patients were already committed."""
+
+    def __init__(self, inserted, error):
+        super().__init__(f"{inserted} patient(s) were inserted before the failure: {error}")
+        self.inserted = inserted
+
+
+def _key(row):
+    """De-duplication key: (first name, last name, dob, phone), names case-insensitive."""
+    # Patient.last_name is nullable, so existing rows may have None there
+    return (
+        (row["first_name"] or "").lower(),
+        (row["last_name"] or "").lower(),
+        row["dob"],
+        row["phone_number"],
+    )
+
+
+def parse_patients(text_file):
+    """Validate a patient CSV (header row with the COLUMNS names) in one pass.
+
+    Returns (rows, errors, repeated): the valid rows as dicts ready to
+    insert, (line number, message) pairs for the rejected ones, and how
+    many rows repeated an earlier row of the same file and were dropped.
+    """
+    reader = csv.DictReader(text_file)
+    header = [name.strip().lower() for name in reader.fieldnames or []]
+    missing = [name for name in REQUIRED if name not in header]
+    if missing:
+        return [], [(1, f"missing column(s): {', '.join(missing)}")], 0
+    reader.fieldnames = header
+
+    today = date.today()
+    rows, errors, seen, repeated = [], [], set(), 0
+    for line, raw in enumerate(reader, start=2):
+        row = {name: (raw.get(name) or "").strip() for name in COLUMNS}
+        problems = [f"{name} is required" for name in REQUIRED if not row[name]]
+        problems += [
+            f"{name} is longer than {limit} characters"
+            for name, limit in MAX_LENGTH.items()
+            if len(row[name]) > limit
+        ]
+        try:
+            row["dob"] = date.fromisoformat(row["dob"]) if row["dob"] else None
+            if row["dob"] and not date(1900, 1, 1) <= row["dob"] <= today:
+                problems.append("dob is out of range")
+        except ValueError:
+            problems.append("dob is not a YYYY-MM-DD date")
+        if row["gender"]:
+            row["gender"] = GENDERS.get(row["gender"].lower())
+            if row["gender"] is None:
+                problems.append("gender must be Male or Female")
+        if row["phone_number"] and not _PHONE.fullmatch(row["phone_number"]):
+            problems.append("phone_number is not a phone number")
+        if row["email"] and "@" not in row["email"]:
+            problems.append("email is not an email address")
+
+        if problems:
+            errors.append((line, "; ".join(problems)))
+            continue
+        key = _key(row)
+        if key in seen:
+            repeated += 1
+            continue
+        seen.add(key)
+        row["email"] = row["email"] or None
+        row["address"] = row["address"] or None
+        rows.append(row)
+    return rows, errors, repeated
+
+
+def import_patients(rows, batch_size=BATCH_SIZE, dry_run=False):
+    """Insert the patients that do not exist yet, one transaction per batch.
+
+    Existing patients are found through the (dob, phone_number) index and
+    compared by name. For a real import the lookup locks those index ranges
+    (FOR UPDATE) until the batch commits, so a concurrent registration of
+    the same patient waits a batch at most instead of the whole file. With
+    dry_run the lookup is a plain read and nothing is written. A failing
+    batch raises ImportInterrupted; re-running the file is safe because the
+    committed rows are then skipped as existing.
+    Returns {"inserted", "existing", "seconds", "rows_per_sec"}.
+    """
+    start = time.perf_counter()
+    inserted = existing = 0
+    for i in range(0, len(rows), batch_size):
+        batch = rows[i : i + batch_size]
+        pairs = sorted({(row["dob"], row["phone_number"]) for row in batch})
+        try:
+            with transaction() as tx:
+                found = tx.execute(
+                    "SELECT first_name, last_name, dob, phone_number FROM Patient "
+                    f"WHERE (dob, phone_number) IN ({', '.join(['(%s, %s)'] * len(pairs))})"
+                    + ("" if dry_run else " FOR UPDATE"),
+                    tuple(value for pair in pairs for value in pair),
+                    fetch=True,
+                )
+                known = {_key(row) for row in found}
+                new = [row for row in batch if _key(row) not in known]
+                if new and not dry_run:
+                    tx.execute(
+                        f"INSERT INTO Patient ({', '.join(COLUMNS)}) VALUES "
+                        + ", ".join([f"({', '.join(['%s'] * len(COLUMNS))})"] * len(new)),
+                        tuple(row[name] for row in new for name in COLUMNS),
+                    )
+        except Exception as e:
+            if dry_run or not inserted:
+                raise
+            raise ImportInterrupted(inserted, e) from e
+        existing += len(batch) - len(new)
+        inserted += len(new)
+
+    seconds = time.perf_counter() - start
+    return {
+        "inserted": inserted,
+        "existing": existing,
+        "seconds": seconds,
+        "rows_per_sec": len(rows) / seconds if seconds else 0.0,
+    }
@@ -0,0 +1,29 @@
+from db_utils import run_query
+
+LOOKUP_LIMIT = 20
+
+
+def find_patients(dob, phone=None, name_prefix=None, limit=LOOKUP_LIMIT):
+    """Look up patients for login by date of birth plus phone number or name prefix.
+
+    Served by the (dob, phone_number) and (dob, last_name, first_name)
+    indexes. At most `limit` + 1 rows are returned so callers can tell the
+    search needs refining. Returns None on a database error, like run_query.
+    """
+    query = """
+        SELECT patient_id, first_name, last_name, phone_number, email
+        FROM Patient
+        WHERE dob = %s
+    """
+    params = [dob]
+    if phone:
+        query += " AND phone_number = %s"
+        params.append(phone.strip())
+    if name_prefix:
+        # Escape LIKE wildcards typed by the user
+        prefix = name_prefix.strip().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        query += " AND (last_name LIKE %s OR first_name LIKE %s)"
+        params += [f"{prefix}%", f"{prefix}%"]
+    query += " ORDER BY last_name, first_name, patient_id LIMIT %s"
+    params.append(limit + 1)
+    return run_query(query, tuple(params), fetch=True)
@@ -0,0 +1,85 @@
+import re
+
+from db_utils import run_query
+
+PAGE_SIZE = 20
+MIN_TERM_LENGTH = 3  # InnoDB's default innodb_ft_min_token_size
+
+
+def boolean_query(text):
+    """Turn free text into a FULLTEXT boolean query requiring every word as a prefix.
+
+    Operators typed by the user are dropped, and so are words shorter than
+    the indexed token size (they would never match). Returns None if no
+    searchable word is left.
+    """
+    terms = [t for t in re.findall(r"\w+", text) if len(t) >= MIN_TERM_LENGTH]
+    return " ".join(f"+{term}*" for term in terms) or None
+
+
+def search_patients(text, page=0, page_size=PAGE_SIZE):
+    """Patients whose first or last name matches, best match first.
+
+    Returns (rows, has_next); rows is None on a database error.
+    """
+    query = boolean_query(text)
+    if query is None:
+        return [], False
+    rows = run_query(
+        """
+        SELECT
+            patient_id, first_name, last_name, dob, phone_number, email,
+            MATCH(first_name, last_name) AGAINST (%s IN BOOLEAN MODE) AS score
+        FROM Patient
+        WHERE MATCH(first_name, last_name) AGAINST (%s IN BOOLEAN MODE)
+        ORDER BY score DESC, patient_id
+        LIMIT %s OFFSET %s
+        """,
+        (query, query, page_size + 1, page * page_size),
+        fetch=True,
+    )
+    if rows is None:
+        return None, False
+    return rows[:page_size], len(rows) > page_size
+
+
+def search_records(text, doctor_id=None, page=0, page_size=PAGE_SIZE):
+    """Medical records whose diagnosis, prescription or notes match, best match first.
+
+    With doctor_id, only records of that doctor's appointments are searched.
+    Returns (rows, has_next); rows is None on a database error.
+    """
+    query = boolean_query(text)
+    if query is None:
+        return [], False
+    doctor_filter = "AND sch.doctor_id = %s" if doctor_id else ""
+    rows = run_query(
+        f"""
+        SELECT
+            r.appointment_id,
+            r.diagnosis,
+            r.prescription,
+            r.notes,
+            a.appointment_datetime,
+            p.patient_id,
+            p.first_name AS patient_first,
+            p.last_name AS patient_last,
+            d.first_name AS doctor_first,
+            d.last_name AS doctor_last,
+            MATCH(r.diagnosis, r.prescription, r.notes) AGAINST (%s IN BOOLEAN MODE) AS score
+        FROM Record r
+        JOIN Appointment a ON r.appointment_id = a.appointment_id
+        JOIN Patient p ON a.patient_id = p.patient_id
+        JOIN Schedule sch ON a.schedule_id = sch.schedule_id
+        JOIN Doctor d ON sch.doctor_id = d.doctor_id
+        WHERE MATCH(r.diagnosis, r.prescription, r.notes) AGAINST (%s IN BOOLEAN MODE)
+        {doctor_filter}
+        ORDER BY score DESC, a.appointment_datetime DESC
+        LIMIT %s OFFSET %s
+        """,
+        (query, query, *((doctor_id,) if doctor_id else ()), page_size + 1, page * page_size),
+        fetch=True,
+    )
+    if rows is None:
+        return None, False
+    return rows[:page_size], len(rows) > page_size
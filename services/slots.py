@@ -0,0 +1,75 @@
+from db_utils import run_query, transaction
+
+HORIZON_DAYS = 28
+
+# One date per day of the horizon; DAYNAME() matches Schedule.available_day.
+# Today's slots that have already started are not created.
+_GENERATE = """
+    INSERT IGNORE INTO Slot (schedule_id, doctor_id, slot_date, start_time, end_time)
+    WITH RECURSIVE days (day) AS (
+        SELECT CURDATE()
+        UNION ALL
+        SELECT day + INTERVAL 1 DAY FROM days WHERE day < CURDATE() + INTERVAL %s DAY
+    )
+    SELECT sch.schedule_id, sch.doctor_id, days.day, sch.start_time, sch.end_time
+    FROM Schedule sch
+    JOIN days ON DAYNAME(days.day) = sch.available_day
+    WHERE TIMESTAMP(days.day, sch.start_time) > NOW()
+"""
+
+# Scheduled appointments that are not tied to their dated slot yet
+_LINK_APPOINTMENTS = """
+    UPDATE Slot sl
+    JOIN Appointment a
+      ON a.schedule_id = sl.schedule_id
+     AND a.appointment_datetime = TIMESTAMP(sl.slot_date, sl.start_time)
+    SET sl.is_booked = TRUE, sl.appointment_id = a.appointment_id
+    WHERE sl.slot_date >= CURDATE()
+      AND sl.appointment_id IS NULL
+      AND a.status = 'scheduled'
+"""
+
+# Booked slots whose appointment was deleted (Slot.appointment_id is
+# ON DELETE SET NULL, e.g. via the Patient cascade); relinked below if a
+# scheduled appointment still matches
+_RELEASE_ORPHANS = "UPDATE Slot SET is_booked = FALSE WHERE is_booked = TRUE AND appointment_id IS NULL"
+
+
+def generate_slots(horizon_days=HORIZON_DAYS, rebuild=False):
+    """Materialize dated slots from the weekly templates, today through `horizon_days` ahead.
+
+    Idempotent: existing instances are kept, so running it daily only adds
+    the new last day (and any new templates). Slots left booked by a deleted
+    appointment are freed, upcoming scheduled appointments are linked to
+    their instance, and unbooked instances that have started are deleted.
+    `rebuild` empties the table first, for use after Schedule was reloaded
+    wholesale. Returns {"created", "released", "linked", "expired"} row counts.
+    """
+    with transaction() as tx:
+        if rebuild:
+            tx.execute("DELETE FROM Slot")
+        created = tx.execute(_GENERATE, (horizon_days - 1,))
+        released = tx.execute(_RELEASE_ORPHANS)
+        linked = tx.execute(_LINK_APPOINTMENTS)
+        expired = tx.execute(
+            "DELETE FROM Slot WHERE TIMESTAMP(slot_date, start_time) <= NOW() AND is_booked = FALSE"
+        )
+    return {"created": created, "released": released, "linked": linked, "expired": expired}
+
+
+def available_slots(doctor_id, start_date, end_date):
+    """Free, not yet started slot instances of a doctor from start_date through end_date, in calendar order."""
+    return run_query(
+        """
+        SELECT slot_id, slot_date, start_time, end_time
+        FROM Slot
+        WHERE doctor_id = %s
+          AND slot_date >= %s
+          AND slot_date <= %s
+          AND is_booked = FALSE
+          AND TIMESTAMP(slot_date, start_time) > NOW()
+        ORDER BY slot_date, start_time
+    """,
+        (doctor_id, start_date, end_date),
+        fetch=True,
+    )
@@ -0,0 +1,53 @@
+from db_utils import transaction
+
+# Aggregates as computed from the base tables (admin.sql #1 and #2, by status)
+APPOINTMENT_COUNTS = """
+    SELECT IFNULL(status, 'unknown') AS status, COUNT(*) AS appointment_count
+    FROM Appointment
+    GROUP BY IFNULL(status, 'unknown')
+"""
+REVENUE_TOTALS = """
+    SELECT IFNULL(status, 'unknown') AS status,
+           COUNT(*) AS invoice_count,
+           IFNULL(SUM(amount), 0) AS total_amount
+    FROM Invoice
+    GROUP BY IFNULL(status, 'unknown')
+"""
+
+
+def _by_status(rows, *fields):
+    return {row["status"]: tuple(row[f] for f in fields) for row in rows if any(row[f] for f in fields)}
+
+
+def rebuild_summary():
+    """Recompute the dashboard summary tables from the base tables.
+
+    Runs in one transaction, so the dashboard never sees an empty summary.
+    Returns the statuses whose stored aggregates had drifted, as
+    {table: {status: (stored, actual)}}.
+    """
+    with transaction() as tx:
+        stored_appointments = tx.execute("SELECT * FROM AppointmentSummary FOR UPDATE", fetch=True)
+        stored_revenue = tx.execute("SELECT * FROM RevenueSummary FOR UPDATE", fetch=True)
+        actual_appointments = tx.execute(APPOINTMENT_COUNTS, fetch=True)
+        actual_revenue = tx.execute(REVENUE_TOTALS, fetch=True)
+
+        tx.execute("DELETE FROM AppointmentSummary")
+        tx.execute(f"INSERT INTO AppointmentSummary (status, appointment_count) {APPOINTMENT_COUNTS}")
+        tx.execute("DELETE FROM RevenueSummary")
+        tx.execute(f"INSERT INTO RevenueSummary (status, invoice_count, total_amount) {REVENUE_TOTALS}")
+
+    drift = {}
+    for table, stored, actual, fields in (
+        ("AppointmentSummary", stored_appointments, actual_appointments, ("appointment_count",)),
+        ("RevenueSummary", stored_revenue, actual_revenue, ("invoice_count", "total_amount")),
+    ):
+        stored, actual = _by_status(stored, *fields), _by_status(actual, *fields)
+        changed = {
+            status: (stored.get(status), actual.get(status))
+            for status in stored.keys() | actual.keys()
+            if stored.get(status) != actual.get(status)
+        }
+        if changed:
+            drift[table] = changed
+    return drift
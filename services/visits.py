@@ -0,0 +1,163 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from db_utils import run_query
+
+HISTORY_LIMIT = 5
+PREFETCH_WORKERS = 2
+PREFETCH_TTL = 300
+
+_prefetch_pool = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="prefetch")
+_prefetch_lock = threading.Lock()
+# doctor_id -> (future, appointment it was started from, submitted_at)
+_prefetched = {}
+
+
+def load_patient_context(appointment_id, history_limit=HISTORY_LIMIT):
+    """Everything the doctor visit screens show, fetched in one round trip.
+
+    Joins the appointment to its patient and, through a LATERAL subquery,
+    to that patient's last `history_limit` completed visits with their
+    records. Returns a dict with the appointment fields, a "patient" dict
+    and a "history" list (newest first), or None if the appointment does
+    not exist or the query fails.
+    """
+    rows = run_query(
+        """
+        SELECT
+            cur.appointment_id,
+            cur.patient_id,
+            cur.reason_for_visit,
+            cur.appointment_datetime,
+            cur.status,
+            p.first_name,
+            p.last_name,
+            p.dob,
+            p.gender,
+            p.phone_number,
+            p.email,
+            p.address,
+            h.appointment_datetime AS visit_datetime,
+            h.reason_for_visit AS visit_reason,
+            h.diagnosis,
+            h.prescription,
+            h.notes
+        FROM Appointment cur
+        JOIN Patient p ON cur.patient_id = p.patient_id
+        LEFT JOIN LATERAL (
+            SELECT a.appointment_datetime, a.reason_for_visit, r.diagnosis, r.prescription, r.notes
+            FROM Appointment a
+            LEFT JOIN Record r ON a.appointment_id = r.appointment_id
+            WHERE a.patient_id = cur.patient_id
+              AND a.status = 'completed'
+              AND a.appointment_id != cur.appointment_id
+            ORDER BY a.appointment_datetime DESC
+            LIMIT %s
+        ) h ON TRUE
+        WHERE cur.appointment_id = %s
+        ORDER BY h.appointment_datetime DESC
+    """,
+        (history_limit, appointment_id),
+        fetch=True,
+    )
+    if not rows:
+        return None
+
+    first = rows[0]
+    return {
+        "appointment_id": first["appointment_id"],
+        "patient_id": first["patient_id"],
+        "reason_for_visit": first["reason_for_visit"],
+        "appointment_datetime": first["appointment_datetime"],
+        "status": first["status"],
+        "patient": {
+            key: first[key]
+            for key in ("first_name", "last_name", "dob", "gender", "phone_number", "email", "address")
+        },
+        "history": [
+            {
+                "appointment_datetime": row["visit_datetime"],
+                "reason_for_visit": row["visit_reason"],
+                "diagnosis": row["diagnosis"],
+                "prescription": row["prescription"],
+                "notes": row["notes"],
+            }
+            for row in rows
+            if row["visit_datetime"] is not None
+        ],
+    }
+
+
+def next_appointment_id(doctor_id, after_appointment_id, after_datetime):
+    """The doctor's next scheduled appointment after the given one, or None."""
+    rows = run_query(
+        """
+        SELECT a.appointment_id
+        FROM Schedule sch
+        JOIN Appointment a ON a.schedule_id = sch.schedule_id
+        WHERE sch.doctor_id = %s
+          AND a.status = 'scheduled'
+          AND a.appointment_datetime >= %s
+          AND a.appointment_id != %s
+        ORDER BY a.appointment_datetime, a.appointment_id
+        LIMIT 1
+    """,
+        (doctor_id, after_datetime, after_appointment_id),
+        fetch=True,
+    )
+    return rows[0]["appointment_id"] if rows else None
+
+
+def _load_next(doctor_id, context):
+    appointment_id = next_appointment_id(
+        doctor_id, context["appointment_id"], context["appointment_datetime"]
+    )
+    return load_patient_context(appointment_id) if appointment_id else None
+
+
+def prefetch_next_context(doctor_id, context):
+    """Warm the context of the doctor's next appointment in the background.
+
+    Runs on a small shared thread pool (PREFETCH_WORKERS threads), so a busy
+    clinic cannot open more than that many extra connections for it. Each
+    doctor has at most one prefetch; starting one from a different visit
+    cancels the old one, and reruns of the same visit reuse it.
+    """
+    with _prefetch_lock:
+        current = _prefetched.get(doctor_id)
+        if current and current[1] == context["appointment_id"]:
+            return
+        if current:
+            current[0].cancel()
+        _prefetched[doctor_id] = (
+            _prefetch_pool.submit(_load_next, doctor_id, context),
+            context["appointment_id"],
+            time.monotonic(),
+        )
+
+
+def take_prefetched_context(doctor_id, appointment_id):
+    """The prefetched context for this appointment if it is ready and fresh, else None."""
+    with _prefetch_lock:
+        current = _prefetched.get(doctor_id)
+        if not current:
+            return None
+        future, _, submitted_at = current
+        if not future.done() or future.cancelled() or future.exception() is not None:
+            return None
+        context = future.result()
+        if context is None or context["appointment_id"] != appointment_id:
+            return None
+        del _prefetched[doctor_id]
+    if time.monotonic() - submitted_at > PREFETCH_TTL:
+        return None
+    return context
+
+
+def cancel_prefetch(doctor_id):
+    """Drop the doctor's prefetch; a query already running finishes but is discarded."""
+    with _prefetch_lock:
+        current = _prefetched.pop(doctor_id, None)
+    if current:
+        current[0].cancel()